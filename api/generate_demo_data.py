@@ -11,12 +11,19 @@ without needing to run the actual scraper. It creates:
 import os
 import sys
 import sqlite3
+import numpy as np
 import pandas as pd
-import random
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
 # Add the repository root to Python path
 repo_root = Path(__file__).parent.parent
 sys.path.append(str(repo_root))
@@ -27,25 +34,28 @@ demo_data_dir.mkdir(exist_ok=True)
 
 # Sample data generation parameters
 NUM_RECORDS = 250
-START_DATE = datetime.now() - timedelta(days=30)
 END_DATE = datetime.now()
+START_DATE = END_DATE - timedelta(days=30)
+
+# Format of all timestamp columns
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
 
 # Sample names
-FIRST_NAMES = [
+FIRST_NAMES = np.array([
     "John", "Jane", "Michael", "Sarah", "David", "Emily", "Robert", "Jessica",
     "William", "Jennifer", "James", "Amanda", "Charles", "Elizabeth", "Thomas",
     "Mary", "Daniel", "Patricia", "Matthew", "Linda", "Donald", "Barbara",
     "Steven", "Susan", "Paul", "Margaret", "Andrew", "Kelly", "Joshua", "Nancy"
-]
+], dtype=object)
 
-LAST_NAMES = [
+LAST_NAMES = np.array([
     "Smith", "Johnson", "Williams", "Jones", "Brown", "Davis", "Miller", "Wilson",
     "Moore", "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin",
     "Thompson", "Garcia", "Martinez", "Robinson", "Clark", "Rodriguez", "Lewis",
     "Lee", "Walker", "Hall", "Allen", "Young", "King", "Wright"
-]
+], dtype=object)
 
-CHARGES = [
+CHARGES = np.array([
     "Driving Under the Influence",
     "Possession of Controlled Substance",
     "Public Intoxication",
@@ -62,76 +72,110 @@ CHARGES = [
     "Criminal Mischief",
     "Domestic Violence",
     "Unlawful Carrying Weapon"
-]
+], dtype=object)
 
-def random_date(start, end):
-    """Generate a random datetime between start and end"""
-    # Handle case where start and end are the same or very close
-    if start >= end:
-        return start
-        
-    delta = end - start
-    int_delta = (delta.days * 24 * 60 * 60) + delta.seconds
-    
-    # Ensure we have at least one second difference
-    if int_delta <= 0:
-        return start
-        
-    random_second = random.randrange(int_delta)
-    return start + timedelta(seconds=random_second)
+# Maximum number of charges per inmate
+MAX_CHARGES = 3
+
+# Possible bond amounts (NaN for no bond set)
+BOND_AMOUNTS = np.array([np.nan, 500, 1000, 2000, 5000, 10000, 15000, 25000])
+
+# Column order of the processed_inmates table
+COLUMNS = [
+    "inmate_id", "booking_number", "first_name", "last_name", "full_name",
+    "gender", "race", "booking_date", "release_date", "in_custody",
+    "charges", "bond_amount", "first_seen_timestamp", "last_updated",
+    "jurisdiction", "state"
+]
 
 def generate_inmate_data():
-    """Generate random inmate data"""
-    inmates = []
-    
-    for i in range(NUM_RECORDS):
-        first_name = random.choice(FIRST_NAMES)
-        last_name = random.choice(LAST_NAMES)
-        booking_date = random_date(START_DATE, END_DATE)
-        
-        # Some inmates will be released, others still in custody
-        released = random.random() > 0.4
-        release_date = None
-        if released:
-            min_stay = booking_date + timedelta(hours=4)
-            max_stay = min(booking_date + timedelta(days=10), END_DATE)
-            release_date = random_date(min_stay, max_stay)
-        
-        # Generate between 1 and 3 charges for each inmate
-        num_charges = random.randint(1, 3)
-        charges = random.sample(CHARGES, num_charges)
-        charge_str = "; ".join(charges)
-        
-        # Create inmate record
-        inmate = {
-            'inmate_id': f"{10000 + i}",
-            'booking_number': f"BK-{2023}-{10000 + i}",
-            'first_name': first_name,
-            'last_name': last_name,
-            'full_name': f"{first_name} {last_name}",
-            'gender': random.choice(['Male', 'Female']),
-            'race': random.choice(['White', 'Black', 'Hispanic', 'Asian', 'Other']),
-            'booking_date': booking_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'release_date': release_date.strftime('%Y-%m-%d %H:%M:%S') if release_date else None,
-            'in_custody': not released,
-            'charges': charge_str,
-            'bond_amount': random.choice([None, 500, 1000, 2000, 5000, 10000, 15000, 25000]),
-            'first_seen_timestamp': booking_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'jurisdiction': 'DEMO COUNTY',
-            'state': 'TX'
-        }
-        inmates.append(inmate)
+    """Generate random inmate data as a DataFrame, one column at a time"""
+    rng = np.random.default_rng()
+    
+    first_names = rng.choice(FIRST_NAMES, NUM_RECORDS)
+    last_names = rng.choice(LAST_NAMES, NUM_RECORDS)
+    
+    # Booking times as second offsets into the [START_DATE, END_DATE) window
+    span_seconds = max(int((END_DATE - START_DATE).total_seconds()), 1)
+    booking_offsets = rng.integers(0, span_seconds, NUM_RECORDS)
+    
+    # Some inmates will be released, others still in custody. Release happens
+    # between 4 hours and 10 days after booking, but never after END_DATE, so
+    # inmates booked within 4 hours of END_DATE are all still in custody
+    min_stay = booking_offsets + 4 * 60 * 60
+    released = (rng.random(NUM_RECORDS) > 0.4) & (min_stay <= span_seconds)
+    max_stay = np.minimum(booking_offsets + 10 * 24 * 60 * 60, span_seconds)
+    stay_window = np.maximum(max_stay - min_stay, 0)
+    release_offsets = min_stay + (rng.random(NUM_RECORDS) * stay_window).astype(np.int64)
+    
+    # Format each timestamp column in one call, skipping inmates still in custody
+    start = pd.Timestamp(START_DATE)
+    booking_strs = (start + pd.to_timedelta(booking_offsets, unit="s")).strftime(TIMESTAMP_FORMAT)
+    release_strs = np.full(NUM_RECORDS, None, dtype=object)
+    release_strs[released] = (
+        start + pd.to_timedelta(release_offsets[released], unit="s")
+    ).strftime(TIMESTAMP_FORMAT)
+    
+    # Generate between 1 and MAX_CHARGES distinct charges for each inmate by
+    # shuffling every row of a charge index table and keeping the leading entries
+    num_charges = rng.integers(1, MAX_CHARGES + 1, NUM_RECORDS)
+    charge_index = rng.permuted(
+        np.tile(np.arange(len(CHARGES)), (NUM_RECORDS, 1)), axis=1
+    )[:, :MAX_CHARGES]
+    charge_strs = [
+        "; ".join(CHARGES[row[:count]])
+        for row, count in zip(charge_index, num_charges)
+    ]
+    
+    ids = pd.Series(10000 + np.arange(NUM_RECORDS)).astype(str)
+    
+    inmates = pd.DataFrame({
+        'inmate_id': ids,
+        'booking_number': "BK-2023-" + ids,
+        'first_name': first_names,
+        'last_name': last_names,
+        'full_name': pd.Series(first_names) + " " + pd.Series(last_names),
+        'gender': rng.choice(['Male', 'Female'], NUM_RECORDS),
+        'race': rng.choice(['White', 'Black', 'Hispanic', 'Asian', 'Other'], NUM_RECORDS),
+        'booking_date': booking_strs,
+        'release_date': release_strs,
+        'in_custody': ~released,
+        'charges': charge_strs,
+        'bond_amount': rng.choice(BOND_AMOUNTS, NUM_RECORDS),
+        'first_seen_timestamp': booking_strs,
+        'last_updated': datetime.now().strftime(TIMESTAMP_FORMAT),
+        'jurisdiction': 'DEMO COUNTY',
+        'state': 'TX'
+    }, columns=COLUMNS)
     
     return inmates
 
+def to_arrow_table(inmates):
+    """Return inmate records as a pyarrow Table, converting a DataFrame if needed"""
+    if isinstance(inmates, pa.Table):
+        return inmates
+    return pa.Table.from_pandas(inmates, preserve_index=False)
+
+def column_values(inmates):
+    """Return one list of Python values per column in COLUMNS order, with None for missing values"""
+    if pyarrow_available:
+        table = to_arrow_table(inmates)
+        return [table.column(column).to_pylist() for column in COLUMNS]
+    
+    return [
+        inmates[column].astype(object).where(inmates[column].notna(), None).tolist()
+        for column in COLUMNS
+    ]
+
 def create_database(inmates):
-    """Create SQLite database with inmate records"""
+    """Create SQLite database with inmate records (a DataFrame or pyarrow Table)"""
     db_path = demo_data_dir / "demo_inmates.db"
     
     # Connect to the database (creates it if it doesn't exist)
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
     
     # Create tables
     cursor.execute('''
@@ -155,30 +199,30 @@ def create_database(inmates):
     )
     ''')
     
-    # Insert data
-    for inmate in inmates:
-        cursor.execute('''
-        INSERT OR REPLACE INTO processed_inmates VALUES (
-            :inmate_id, :booking_number, :first_name, :last_name, :full_name,
-            :gender, :race, :booking_date, :release_date, :in_custody,
-            :charges, :bond_amount, :first_seen_timestamp, :last_updated,
-            :jurisdiction, :state
+    # Replace the previous demo rows in a single transaction, inserting
+    # positional tuples in column order with missing values as NULL
+    placeholders = ", ".join(["?"] * len(COLUMNS))
+    with conn:
+        cursor.execute("DELETE FROM processed_inmates")
+        cursor.executemany(
+            f"INSERT INTO processed_inmates VALUES ({placeholders})",
+            zip(*column_values(inmates))
         )
-        ''', inmate)
     
-    # Commit and close
-    conn.commit()
+    # Close the connection
     conn.close()
     
     return db_path
 
 def create_csv(inmates):
-    """Create CSV file with inmate records"""
+    """Create CSV file with inmate records (a DataFrame or pyarrow Table)"""
     csv_path = demo_data_dir / "demo_inmates.csv"
     
-    # Convert to dataframe and save as CSV
-    df = pd.DataFrame(inmates)
-    df.to_csv(csv_path, index=False)
+    # Save the records as CSV, using Arrow's C++ writer when available
+    if pyarrow_available:
+        pa_csv.write_csv(to_arrow_table(inmates), csv_path)
+    else:
+        inmates.to_csv(csv_path, index=False)
     
     return csv_path
 
@@ -206,6 +250,10 @@ def main():
     inmates = generate_inmate_data()
     print(f"Generated {len(inmates)} inmate records")
     
+    # Convert to Arrow once so the database and CSV are written from the same table
+    if pyarrow_available:
+        inmates = to_arrow_table(inmates)
+    
     # Create database
     db_path = create_database(inmates)
     print(f"Created demo database at {db_path}")
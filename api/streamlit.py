@@ -20,21 +20,22 @@ def start_streamlit():
         "--theme.base", "light"
     ]
     
-    # Run the process
+    # Run the process, keeping its output as raw bytes
     return subprocess.Popen(
         cmd,
         env=os.environ.copy(),
         stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        universal_newlines=True
+        stderr=subprocess.STDOUT
     )
 
 # Start the streamlit server
 process = start_streamlit()
 
-# Read the output and print for debugging
-for line in process.stdout:
-    print(line, end="")
+# Forward the output for debugging in chunks, as soon as each read returns
+stdout_fd = process.stdout.fileno()
+while chunk := os.read(stdout_fd, 65536):
+    sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
 
 # For vercel serverless function
 def handler(event, context):
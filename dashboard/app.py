@@ -7,9 +7,16 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import sys
 import plotly.express as px
+from collections import namedtuple
 from dotenv import load_dotenv
 import logging
 
+try:
+    import pyarrow
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -52,75 +59,139 @@ st.set_page_config(
 st.title("📊 Jail Roster Data Monitor")
 st.markdown("Dashboard for monitoring jail roster data collected by the scraper.")
 
-# Define paths
-if hasattr(config, "STATE_DB"):
-    db_path = Path(config.STATE_DB)
-else:
-    db_path = Path("../data/processed_inmates.db")
-
-if hasattr(config, "OUTPUT_CSV"):
-    csv_path = Path(config.OUTPUT_CSV)
-else:
-    csv_path = Path("../data/new_inmates.csv")
-
-if hasattr(config, "OUTPUT_CSV_DIR"):
-    csv_dir = Path(config.OUTPUT_CSV_DIR)
-else:
-    csv_dir = Path("../data")
+# Resolved locations of the scraper's output
+DashboardPaths = namedtuple("DashboardPaths", ["db", "csv", "csv_dir"])
 
-# Make paths absolute if they're relative
-if not db_path.is_absolute():
-    db_path = Path(Path(__file__).parent.parent / db_path)
-
-if not csv_path.is_absolute():
-    csv_path = Path(Path(__file__).parent.parent / csv_path)
-
-if not csv_dir.is_absolute():
-    csv_dir = Path(Path(__file__).parent.parent / csv_dir)
+@st.cache_resource
+def resolve_paths():
+    """
+    Resolve the database and CSV locations from the config
+    
+    Cached as a resource so the resolution runs once per server process rather
+    than on every script rerun.
+    """
+    # Define paths
+    if hasattr(config, "STATE_DB"):
+        db = Path(config.STATE_DB)
+    else:
+        db = Path("../data/processed_inmates.db")
+    
+    if hasattr(config, "OUTPUT_CSV"):
+        csv = Path(config.OUTPUT_CSV)
+    else:
+        csv = Path("../data/new_inmates.csv")
+    
+    if hasattr(config, "OUTPUT_CSV_DIR"):
+        csv_dir = Path(config.OUTPUT_CSV_DIR)
+    else:
+        csv_dir = Path("../data")
+    
+    # Make paths absolute if they're relative
+    repo_root = Path(__file__).parent.parent
+    if not db.is_absolute():
+        db = repo_root / db
+    
+    if not csv.is_absolute():
+        csv = repo_root / csv
+    
+    if not csv_dir.is_absolute():
+        csv_dir = repo_root / csv_dir
+    
+    logger.info(f"Using paths - DB: {db}, CSV: {csv}, CSV Dir: {csv_dir}")
+    return DashboardPaths(db, csv, csv_dir)
 
-logger.info(f"Using paths - DB: {db_path}, CSV: {csv_path}, CSV Dir: {csv_dir}")
+db_path, csv_path, csv_dir = resolve_paths()
 
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_latest_csv_file():
-    """Get the latest CSV file based on modification time"""
+def find_latest_csv_file(directory, dir_mtime_ns):
+    """
+    Find the most recently modified CSV file in a directory
+    
+    Args:
+        directory: Directory to search
+        dir_mtime_ns: Modification time of the directory, so the cache is
+                      refreshed when files are added or removed
+    """
     try:
-        # Make sure the directory exists
-        if not csv_dir.exists():
-            logger.warning(f"CSV directory {csv_dir} does not exist")
-            return None
-            
-        # Get all CSV files
-        csv_files = list(csv_dir.glob("*.csv"))
-        if not csv_files:
-            logger.warning(f"No CSV files found in {csv_dir}")
+        # Pick the newest CSV file in a single directory pass
+        with os.scandir(directory) as entries:
+            latest_entry = max(
+                (entry for entry in entries if entry.name.endswith(".csv") and entry.is_file()),
+                key=lambda entry: entry.stat().st_mtime,
+                default=None
+            )
+        
+        if latest_entry is None:
+            logger.warning(f"No CSV files found in {directory}")
             return None
             
-        # Sort by modification time (newest first)
-        latest_file = max(csv_files, key=os.path.getmtime)
+        latest_file = Path(latest_entry.path)
         logger.info(f"Found latest CSV file: {latest_file}")
         return latest_file
     except Exception as e:
         logger.error(f"Error finding latest CSV file: {e}")
         return None
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
+def get_latest_csv_file():
+    """Get the latest CSV file based on modification time"""
+    try:
+        dir_mtime_ns = csv_dir.stat().st_mtime_ns
+    except OSError:
+        # Make sure the directory exists
+        logger.warning(f"CSV directory {csv_dir} does not exist")
+        return None
+    
+    return find_latest_csv_file(csv_dir, dir_mtime_ns)
+
+@st.cache_data
+def read_csv_data(file_path, mtime):
+    """
+    Read a CSV file, using a sibling Parquet file as a cache when it is up to date
+    
+    Args:
+        file_path: Path to the CSV file
+        mtime: Modification time of the CSV file, so the cache is keyed on it
+    """
+    parquet_path = file_path.with_suffix(".parquet")
+    
+    # Use the Parquet copy unless the CSV has changed since it was written
+    try:
+        if parquet_path.exists() and parquet_path.stat().st_mtime >= mtime:
+            logger.info(f"Loading cached Parquet copy: {parquet_path}")
+            return pd.read_parquet(parquet_path, engine="pyarrow", dtype_backend="pyarrow")
+    except Exception as e:
+        logger.warning(f"Could not read Parquet cache {parquet_path}: {e}")
+    
+    if pyarrow_available:
+        # Arrow's multithreaded parser, keeping the columns Arrow-backed
+        df = pd.read_csv(file_path, engine="pyarrow", dtype_backend="pyarrow")
+    else:
+        df = pd.read_csv(file_path)
+    
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", index=False)
+    except Exception as e:
+        logger.warning(f"Could not write Parquet cache {parquet_path}: {e}")
+    
+    return df
+
 def load_data_from_csv():
     """Load data from the latest CSV file"""
     try:
         # Try to use the direct path first
         if csv_path.exists():
             logger.info(f"Loading data from configured CSV path: {csv_path}")
-            df = pd.read_csv(csv_path)
-            last_modified = datetime.fromtimestamp(os.path.getmtime(csv_path))
-            return df, last_modified, csv_path
+            mtime = os.path.getmtime(csv_path)
+            df = read_csv_data(csv_path, mtime)
+            return df, datetime.fromtimestamp(mtime), csv_path
             
         # If not found, try to find the latest CSV file in the directory
         latest_file = get_latest_csv_file()
         if latest_file and latest_file.exists():
             logger.info(f"Loading data from latest CSV file: {latest_file}")
-            df = pd.read_csv(latest_file)
-            last_modified = datetime.fromtimestamp(os.path.getmtime(latest_file))
-            return df, last_modified, latest_file
+            mtime = os.path.getmtime(latest_file)
+            df = read_csv_data(latest_file, mtime)
+            return df, datetime.fromtimestamp(mtime), latest_file
             
         # If no CSV found
         logger.warning("No CSV files found to load data from")
@@ -129,9 +200,73 @@ def load_data_from_csv():
         logger.error(f"Error loading CSV data: {e}")
         return None, None, None
 
+def connect_readonly(db_file):
+    """Open the SQLite database read-only, with memory-mapped I/O for faster scans"""
+    conn = sqlite3.connect(f"{Path(db_file).resolve().as_uri()}?mode=ro", uri=True)
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+# Timestamp columns used by the different database schemas, in order of preference
+TIMESTAMP_COLUMNS = ["first_seen_timestamp", "processed_timestamp", "timestamp_processed_utc"]
+
+@st.cache_data
+def get_table_columns(db_file, mtime):
+    """
+    Return the set of column names in the processed_inmates table
+    
+    Args:
+        db_file: Path to the SQLite database
+        mtime: Modification time of the database, so the cache is keyed on it
+    """
+    conn = connect_readonly(db_file)
+    try:
+        return {row[1] for row in conn.execute("PRAGMA table_info(processed_inmates)")}
+    finally:
+        conn.close()
+
+def build_filter_clause(columns, filter_column=None, filter_value=None, value_range=None):
+    """
+    Build a SQL condition for the sidebar column filter
+    
+    Args:
+        columns: Column names of the table, used as an allow-list for filter_column
+        filter_column: Column to filter on
+        filter_value: Case-insensitive substring to match in text columns
+        value_range: (min, max) tuple for numeric columns
+        
+    Returns:
+        tuple: (condition, params), where condition is None if no filter applies
+    """
+    if not filter_column or filter_column not in columns:
+        return None, ()
+    
+    if filter_value:
+        # Escape LIKE wildcards so the value is matched literally
+        escaped = filter_value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f'"{filter_column}" LIKE ? ESCAPE \'\\\'', (f"%{escaped}%",)
+    
+    if value_range is not None:
+        return f'"{filter_column}" BETWEEN ? AND ?', tuple(value_range)
+    
+    return None, ()
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def load_data_from_db(hours_back=24):
-    """Load data from the SQLite database"""
+def load_data_from_db(hours_back=24, filter_column=None, filter_value=None, value_range=None):
+    """
+    Load data from the SQLite database
+    
+    Args:
+        hours_back: Only include records first seen within this many hours
+        filter_column: Optional column to filter on in SQL
+        filter_value: Substring to match in filter_column (text columns)
+        value_range: (min, max) range for filter_column (numeric columns)
+    
+    Returns:
+        tuple: (DataFrame, last modified time), or (None, None) if the query
+        failed or, without a filter, found no records
+    """
     try:
         if not db_path.exists():
             logger.warning(f"Database file {db_path} does not exist")
@@ -139,102 +274,79 @@ def load_data_from_db(hours_back=24):
             
         # Connect to the database
         logger.info(f"Connecting to database: {db_path}")
-        conn = sqlite3.connect(db_path)
+        conn = connect_readonly(db_path)
         
-        # Get the last X hours of inmate data
-        timestamp_threshold = (datetime.now() - timedelta(hours=hours_back)).isoformat()
+        # Probe the schema once to pick the query that fits it
+        mtime = os.path.getmtime(db_path)
+        columns = get_table_columns(db_path, mtime)
+        timestamp_column = next((col for col in TIMESTAMP_COLUMNS if col in columns), None)
         
-        # Try different queries based on the possible schema
-        queries = [
-            # Query for the schema with first_seen_timestamp
-            """
-            SELECT * FROM processed_inmates 
-            WHERE first_seen_timestamp >= ? 
-            ORDER BY first_seen_timestamp DESC
-            """,
-            # Query for the schema with processed_timestamp
-            """
-            SELECT * FROM processed_inmates 
-            WHERE processed_timestamp >= ? 
-            ORDER BY processed_timestamp DESC
-            """,
-            # Query for the schema with timestamp_processed_utc
-            """
+        # Build the optional column filter, checking the column against the schema
+        condition, filter_params = build_filter_clause(
+            columns, filter_column, filter_value, value_range
+        )
+        and_condition = f"AND {condition}" if condition else ""
+        where_condition = f"WHERE {condition}" if condition else ""
+        
+        if timestamp_column:
+            # Get the last X hours of inmate data
+            timestamp_threshold = (datetime.now() - timedelta(hours=hours_back)).isoformat()
+            query = f"""
             SELECT * FROM processed_inmates 
-            WHERE timestamp_processed_utc >= ? 
-            ORDER BY timestamp_processed_utc DESC
-            """,
-            # Fallback query - just get everything
+            WHERE {timestamp_column} >= ? {and_condition}
+            ORDER BY {timestamp_column} DESC
             """
-            SELECT * FROM processed_inmates
+            params = (timestamp_threshold,) + filter_params
+        else:
+            # No known timestamp column - just get everything
+            logger.warning("No timestamp column found in processed_inmates, loading all records")
+            query = f"""
+            SELECT * FROM processed_inmates {where_condition}
             """
-        ]
+            params = filter_params
         
-        df = None
+        df = pd.read_sql_query(query, conn, params=params)
+        logger.info(f"Loaded {len(df)} records from the database")
         
-        for i, query in enumerate(queries):
-            try:
-                if i < 3:  # First 3 queries need a parameter
-                    df = pd.read_sql_query(query, conn, params=(timestamp_threshold,))
-                else:  # Last query doesn't need a parameter
-                    df = pd.read_sql_query(query, conn)
-                
-                if not df.empty:
-                    logger.info(f"Successfully loaded {len(df)} records using query #{i+1}")
-                    break
-            except Exception as query_error:
-                if i < len(queries) - 1:
-                    logger.warning(f"Query #{i+1} failed: {query_error}. Trying next query.")
-                else:
-                    logger.error(f"All queries failed. Last error: {query_error}")
-        
-        last_modified = datetime.fromtimestamp(os.path.getmtime(db_path))
+        last_modified = datetime.fromtimestamp(mtime)
         conn.close()
         
-        if df is not None and not df.empty:
+        # A filter that matches nothing is still a valid result
+        if not df.empty or condition:
             return df, last_modified
         else:
-            logger.warning("No data found in the database or all queries failed")
+            logger.warning("No data found in the database")
             return None, None
     except Exception as e:
         logger.error(f"Error loading database data: {e}")
         return None, None
 
 # Function to load data based on any available source
-def load_recent_data(source_preference=None):
+def load_recent_data(source_preference=None, hours_back=24):
     """
     Load recent data from any available source - adaptively tries different sources
     
     Args:
         source_preference: "CSV", "DB", or None (auto-detect)
+        hours_back: Time window for database queries
     """
-    data = None
-    last_modified = None
-    source_used = None
-    
-    # If preference is specified, try that first
-    if source_preference == "CSV":
+    def from_csv():
         data, last_modified, file_path = load_data_from_csv()
-        if data is not None:
-            source_used = f"CSV ({file_path.name})"
-    elif source_preference == "DB":
-        data, last_modified = load_data_from_db()
-        if data is not None:
-            source_used = f"Database ({db_path.name})"
+        return data, last_modified, f"CSV ({file_path.name})" if data is not None else None
     
-    # If preference failed or no preference, try both
-    if data is None:
-        # Try CSV first
-        data, last_modified, file_path = load_data_from_csv()
+    def from_db():
+        data, last_modified = load_data_from_db(hours_back)
+        return data, last_modified, f"Database ({db_path.name})" if data is not None else None
+    
+    # Try the preferred source first, then the other one; CSV first if no preference
+    loaders = [from_db, from_csv] if source_preference == "DB" else [from_csv, from_db]
+    
+    for loader in loaders:
+        data, last_modified, source_used = loader()
         if data is not None:
-            source_used = f"CSV ({file_path.name})"
-        else:
-            # Try DB if CSV failed
-            data, last_modified = load_data_from_db()
-            if data is not None:
-                source_used = f"Database ({db_path.name})"
+            return data, last_modified, source_used
     
-    return data, last_modified, source_used
+    return None, None, None
 
 # Sidebar filters
 st.sidebar.header("Filters")
@@ -265,7 +377,7 @@ else:
     hours_back = 24  # Default
 
 # Load the data
-data, last_modified, source_used = load_recent_data(source_map[data_source])
+data, last_modified, source_used = load_recent_data(source_map[data_source], hours_back)
 
 # Display the data source actually used
 if source_used:
@@ -281,18 +393,42 @@ if data is not None and not data.empty:
     )
     
     if filter_column:
-        if data[filter_column].dtype == 'object':
+        filter_value = None
+        value_range = None
+        
+        if not pd.api.types.is_numeric_dtype(data[filter_column]):
             filter_value = st.sidebar.text_input(f"Filter {filter_column} containing:")
-            if filter_value:
-                data = data[data[filter_column].astype(str).str.contains(filter_value, case=False, na=False)]
         else:
+            col_min = float(data[filter_column].min())
+            col_max = float(data[filter_column].max())
             min_val, max_val = st.sidebar.slider(
                 f"Filter {filter_column} range:",
-                min_value=float(data[filter_column].min()),
-                max_value=float(data[filter_column].max()),
-                value=(float(data[filter_column].min()), float(data[filter_column].max()))
+                min_value=col_min,
+                max_value=col_max,
+                value=(col_min, col_max)
             )
-            data = data[(data[filter_column] >= min_val) & (data[filter_column] <= max_val)]
+            if (min_val, max_val) != (col_min, col_max):
+                value_range = (min_val, max_val)
+        
+        if filter_value or value_range:
+            filtered = None
+            if source_used.startswith("Database"):
+                # Let SQLite do the filtering so only matching rows are loaded
+                filtered, _ = load_data_from_db(hours_back, filter_column, filter_value, value_range)
+                if filtered is None:
+                    st.warning("⚠️ Filtered database query failed, filtering the loaded records instead")
+            
+            if filtered is not None:
+                data = filtered
+            elif filter_value:
+                # Only convert the column when it holds non-string values, and
+                # match the value literally rather than compiling it as a regex
+                column = data[filter_column]
+                if not pd.api.types.is_string_dtype(column):
+                    column = column.astype(str)
+                data = data[column.str.contains(filter_value, case=False, na=False, regex=False)]
+            else:
+                data = data[(data[filter_column] >= min_val) & (data[filter_column] <= max_val)]
 
 # Display the data
 st.subheader("Jail Roster Data")
@@ -320,18 +456,39 @@ with col3:
 
 # Display the dataframe
 if data is not None and not data.empty:
-    st.dataframe(data)
+    # Only send the selected columns and the first rows to the browser; the
+    # full frame is still used for the visualizations below
+    display_columns = st.multiselect(
+        "Columns to display:",
+        options=data.columns.tolist(),
+        default=data.columns.tolist()
+    )
+    show_all_rows = st.checkbox("Show all rows", value=False)
+    if show_all_rows:
+        display_data = data[display_columns]
+    else:
+        max_rows = st.slider("Rows to display:", min_value=100, max_value=10000, value=1000, step=100)
+        display_data = data[display_columns].head(max_rows)
     
-    # Auto-detect date/timestamp columns
-    date_columns = []
+    st.dataframe(display_data)
+    st.caption(f"Showing {len(display_data)} of {len(data)} records")
+    
+    # Auto-detect date/timestamp columns. Columns the CSV reader already parsed
+    # are used as-is; text columns are parsed once with a fixed ISO 8601 format
+    # (covers both "YYYY-MM-DD HH:MM:SS" and isoformat())
+    parsed_dates = {}
     for col in data.columns:
-        if ('date' in col.lower() or 'time' in col.lower()) and data[col].dtype == 'object':
-            # Try to convert to datetime to confirm it's a date/time column
-            try:
-                pd.to_datetime(data[col])
-                date_columns.append(col)
-            except:
-                pass
+        if not ('date' in col.lower() or 'time' in col.lower()):
+            continue
+        if data[col].dtype.kind == 'M':  # numpy, tz-aware or Arrow timestamps
+            parsed_dates[col] = data[col]
+        elif data[col].dtype == 'object' or pd.api.types.is_string_dtype(data[col]):
+            parsed = pd.to_datetime(data[col], format='ISO8601', errors='coerce', cache=True)
+            if parsed.notna().any():
+                parsed_dates[col] = parsed
+    
+    data = data.assign(**parsed_dates)
+    date_columns = list(parsed_dates)
     
     # If we have date columns, offer visualization options
     if date_columns:
@@ -340,15 +497,12 @@ if data is not None and not data.empty:
         viz_col = st.selectbox("Select date/time column for visualization:", date_columns)
         
         if viz_col:
-            # Convert to datetime for plotting
-            data['plot_date'] = pd.to_datetime(data[viz_col], errors='coerce')
-            
             # Drop NaT values that couldn't be converted
-            plot_data = data.dropna(subset=['plot_date'])
+            plot_data = data.dropna(subset=[viz_col])
             
             if not plot_data.empty:
-                # Create a count by date
-                date_counts = plot_data.groupby(plot_data['plot_date'].dt.date).size().reset_index()
+                # Create a count by date, flooring to whole days so the key stays datetime64
+                date_counts = plot_data.groupby(plot_data[viz_col].dt.floor('D')).size().reset_index()
                 date_counts.columns = ['date', 'count']
                 
                 # Plot the data
@@ -0,0 +1,56 @@
+import importlib.util
+import logging
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+
+
+def import_script(name, path, tmp):
+    """
+    Import a Streamlit script as a module, in Streamlit's bare mode.
+
+    The scripts render their page at import time, so they are pointed at
+    empty data locations, their log file is redirected into tmp, and the
+    demo data generator is hidden so nothing is written into the repository.
+    """
+    file_handler = logging.FileHandler
+
+    env = {
+        "STATE_DB": str(tmp / "missing.db"),
+        "OUTPUT_CSV": str(tmp / "missing.csv"),
+        "OUTPUT_CSV_DIR": str(tmp),
+    }
+    # Only this entry is swapped out; patching all of sys.modules would unload
+    # everything first imported by the script, such as pandas
+    generator = sys.modules.get("api.generate_demo_data")
+    sys.modules["api.generate_demo_data"] = None
+    try:
+        with mock.patch.dict(os.environ, env), \
+                mock.patch("logging.FileHandler", lambda *args, **kwargs: file_handler(tmp / f"{name}.log")):
+            spec = importlib.util.spec_from_file_location(name, path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+    finally:
+        if generator is None:
+            del sys.modules["api.generate_demo_data"]
+        else:
+            sys.modules["api.generate_demo_data"] = generator
+
+    return module
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """The dashboard/app.py script."""
+    return import_script("dashboard_app", REPO_ROOT / "dashboard" / "app.py", tmp_path_factory.mktemp("app"))
+
+
+@pytest.fixture(scope="session")
+def streamlit_app(tmp_path_factory):
+    """The streamlit_app.py Streamlit Cloud entry point."""
+    return import_script("streamlit_app", REPO_ROOT / "streamlit_app.py", tmp_path_factory.mktemp("streamlit_app"))
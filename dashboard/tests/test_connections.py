@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    path = tmp_path / "inmates.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE processed_inmates (race TEXT)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_connection_is_reused_while_the_file_is_unchanged(streamlit_app, db_file):
+    conn = streamlit_app.get_connection(db_file, 1.0)
+
+    assert streamlit_app.get_connection(str(db_file), 1.0) is conn
+
+
+def test_changed_file_closes_the_superseded_connection(streamlit_app, db_file):
+    old = streamlit_app.get_connection(db_file, 1.0)
+    new = streamlit_app.get_connection(db_file, 2.0)
+
+    assert new is not old
+    assert new.execute("SELECT COUNT(*) FROM processed_inmates").fetchone() == (0,)
+    with pytest.raises(sqlite3.ProgrammingError):
+        old.execute("SELECT 1")
+
+    connections, _ = streamlit_app.open_connections()
+    assert [mtime for mtime, _ in connections.values()].count(2.0) == 1
+
+
+def test_connection_is_read_only(streamlit_app, db_file):
+    conn = streamlit_app.get_connection(db_file, 3.0)
+
+    with pytest.raises(sqlite3.OperationalError):
+        conn.execute("INSERT INTO processed_inmates VALUES ('x')")
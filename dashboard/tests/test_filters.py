@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+COLUMNS = {"name_number", "charges", "bond_amount"}
+
+CHARGES = ["THEFT_50", "THEFTX50", "THEFT 50%", "THEFT 500", "PATH\\TO", "assault"]
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE processed_inmates (name_number TEXT, charges TEXT, bond_amount REAL)")
+    conn.executemany(
+        "INSERT INTO processed_inmates VALUES (?, ?, ?)",
+        [(str(i), charge, i * 1000) for i, charge in enumerate(CHARGES)],
+    )
+    yield conn
+    conn.close()
+
+
+def matching_charges(conn, condition, params):
+    query = f"SELECT charges FROM processed_inmates WHERE {condition} ORDER BY name_number"
+    return [row[0] for row in conn.execute(query, params)]
+
+
+@pytest.mark.parametrize("filter_column", [None, "", "unknown", 'charges" OR 1=1 --'])
+def test_columns_outside_the_allow_list_are_ignored(app, filter_column):
+    assert app.build_filter_clause(COLUMNS, filter_column, "x", (1, 2)) == (None, ())
+
+
+def test_no_value_or_range_means_no_filter(app):
+    assert app.build_filter_clause(COLUMNS, "charges") == (None, ())
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("_", ["THEFT_50"]),
+    ("%", ["THEFT 50%"]),
+    ("50%", ["THEFT 50%"]),
+    ("\\", ["PATH\\TO"]),
+    ("theft", ["THEFT_50", "THEFTX50", "THEFT 50%", "THEFT 500"]),
+    ("ASSAULT", ["assault"]),
+])
+def test_like_wildcards_are_matched_literally(app, conn, value, expected):
+    condition, params = app.build_filter_clause(COLUMNS, "charges", value)
+
+    assert matching_charges(conn, condition, params) == expected
+
+
+def test_value_range_filters_inclusively(app, conn):
+    condition, params = app.build_filter_clause(COLUMNS, "bond_amount", value_range=(1000, 3000))
+
+    assert params == (1000, 3000)
+    assert matching_charges(conn, condition, params) == ["THEFTX50", "THEFT 50%", "THEFT 500"]
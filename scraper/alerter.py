@@ -1,5 +1,7 @@
+import asyncio
 import smtplib
 import logging
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
@@ -7,82 +9,218 @@ from datetime import datetime
 # Import local configuration
 import config
 
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
 # Get logger
 logger = logging.getLogger(__name__)
 
-def send_email_alert(subject: str, body: str, recipients=None, html=True):
+# Alert body templates, filled in with str.format
+HTML_WRAPPER_TEMPLATE = """
+            <html>
+            <body>
+                <p><strong>Time:</strong> {timestamp}</p>
+                <hr>
+                {body}
+                <hr>
+                <p><em>This is an automated alert from the Jail Roster Scraper.</em></p>
+            </body>
+            </html>
+            """
+
+PLAIN_WRAPPER_TEMPLATE = "Time: {timestamp}\n\n{body}\n\nThis is an automated alert from the Jail Roster Scraper."
+
+SUCCESS_ALERT_TEMPLATE = """
+    <html>
+    <body>
+        <h2>Jail Roster Scraper Completed Successfully</h2>
+        <ul>
+            <li><strong>{new_count}</strong> new inmates found and processed</li>
+            <li><strong>{released_count}</strong> inmates marked as released</li>
+        </ul>
+        
+        {details}
+    </body>
+    </html>
     """
-    Send an email alert about the scraper status
+
+ERROR_ALERT_TEMPLATE = """
+    <html>
+    <body>
+        <h2>Jail Roster Scraper Error</h2>
+        <p>The scraper encountered an error during execution:</p>
+        
+        <div style="background-color: #ffeeee; padding: 10px; border: 1px solid #ffcccc;">
+            <pre>{error_message}</pre>
+        </div>
+        
+        {traceback_section}
+        
+        <p>Please check the log files for more details.</p>
+    </body>
+    </html>
+    """
+
+TRACEBACK_SECTION_TEMPLATE = "<h3>Traceback</h3><pre>{traceback}</pre>"
+
+@contextmanager
+def smtp_session():
+    """
+    Open an SMTP connection that can be reused to send several alerts
+    
+    Yields:
+        smtplib.SMTP: Connected server, logged in if credentials are configured
+    """
+    smtp_port = getattr(config, "SMTP_PORT", 587)
+    server = smtplib.SMTP(config.SMTP_HOST, smtp_port)
+    
+    try:
+        server.starttls()
+        
+        # Login if credentials are provided
+        if hasattr(config, "SMTP_USER") and hasattr(config, "SMTP_PASSWORD") and config.SMTP_USER:
+            server.login(config.SMTP_USER, config.SMTP_PASSWORD)
+        
+        yield server
+    finally:
+        try:
+            server.quit()
+        except smtplib.SMTPException:
+            server.close()
+
+def get_alert_recipients(recipients=None):
+    """
+    Check the email configuration and resolve the recipient list
     
     Args:
-        subject: Email subject line
-        body: Email body content
         recipients: Optional list of recipient email addresses (defaults to config.ALERT_EMAIL_TO)
-        html: Whether to send as HTML (True) or plain text (False)
     
     Returns:
-        bool: Success status of the email sending operation
+        list: Recipient addresses, or None if email alerts cannot be sent
     """
     if not hasattr(config, "ENABLE_EMAIL_ALERTS") or not config.ENABLE_EMAIL_ALERTS:
         logger.info("Email alerts disabled in configuration")
-        return False
+        return None
     
     if not hasattr(config, "SMTP_HOST") or not config.SMTP_HOST:
         logger.warning("SMTP host not configured, cannot send email alert")
-        return False
+        return None
     
     if not hasattr(config, "ALERT_EMAIL_FROM") or not config.ALERT_EMAIL_FROM:
         logger.warning("Alert email sender not configured")
-        return False
+        return None
         
-    recipient_list = recipients
-    if recipient_list is None:
+    if recipients is None:
         if not hasattr(config, "ALERT_EMAIL_TO") or not config.ALERT_EMAIL_TO:
             logger.warning("Alert email recipient not configured")
-            return False
-        recipient_list = [config.ALERT_EMAIL_TO]
+            return None
+        recipients = [config.ALERT_EMAIL_TO]
+    
+    return recipients
+
+def build_alert_message(subject: str, body: str, recipient_list, html=True):
+    """
+    Build the email message for an alert
+    
+    Args:
+        subject: Email subject line
+        body: Email body content
+        recipient_list: List of recipient email addresses
+        html: Whether to send as HTML (True) or plain text (False)
+    
+    Returns:
+        MIMEMultipart: The message, ready to send
+    """
+    msg = MIMEMultipart()
+    msg['From'] = config.ALERT_EMAIL_FROM
+    msg['To'] = ", ".join(recipient_list)
+    msg['Subject'] = subject
+    
+    # Add timestamp to the body
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    full_body = body
+    
+    if html:
+        if not body.strip().startswith("<html>"):
+            full_body = HTML_WRAPPER_TEMPLATE.format(timestamp=timestamp, body=body)
+        msg.attach(MIMEText(full_body, 'html'))
+    else:
+        full_body = PLAIN_WRAPPER_TEMPLATE.format(timestamp=timestamp, body=body)
+        msg.attach(MIMEText(full_body, 'plain'))
+    
+    return msg
+
+def send_email_alert(subject: str, body: str, recipients=None, html=True, session=None):
+    """
+    Send an email alert about the scraper status
+    
+    Args:
+        subject: Email subject line
+        body: Email body content
+        recipients: Optional list of recipient email addresses (defaults to config.ALERT_EMAIL_TO)
+        html: Whether to send as HTML (True) or plain text (False)
+        session: Optional open SMTP connection from smtp_session(); a new
+                 connection is opened for this message if not provided
+    
+    Returns:
+        bool: Success status of the email sending operation
+    """
+    recipient_list = get_alert_recipients(recipients)
+    if recipient_list is None:
+        return False
     
     try:
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = config.ALERT_EMAIL_FROM
-        msg['To'] = ", ".join(recipient_list)
-        msg['Subject'] = subject
-        
-        # Add timestamp to the body
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        full_body = body
-        
-        if html:
-            if not body.strip().startswith("<html>"):
-                full_body = f"""
-                <html>
-                <body>
-                    <p><strong>Time:</strong> {timestamp}</p>
-                    <hr>
-                    {body}
-                    <hr>
-                    <p><em>This is an automated alert from the Jail Roster Scraper.</em></p>
-                </body>
-                </html>
-                """
-            msg.attach(MIMEText(full_body, 'html'))
-        else:
-            full_body = f"Time: {timestamp}\n\n{body}\n\nThis is an automated alert from the Jail Roster Scraper."
-            msg.attach(MIMEText(full_body, 'plain'))
+        msg = build_alert_message(subject, body, recipient_list, html)
         
-        # Connect to SMTP server
-        smtp_port = getattr(config, "SMTP_PORT", 587)
-        server = smtplib.SMTP(config.SMTP_HOST, smtp_port)
-        server.starttls()
+        # Send email, reusing the caller's connection if there is one
+        if session is not None:
+            session.send_message(msg)
+        else:
+            with smtp_session() as server:
+                server.send_message(msg)
         
-        # Login if credentials are provided
-        if hasattr(config, "SMTP_USER") and hasattr(config, "SMTP_PASSWORD") and config.SMTP_USER:
-            server.login(config.SMTP_USER, config.SMTP_PASSWORD)
+        logger.info(f"Email alert sent successfully to {', '.join(recipient_list)}")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to send email alert: {str(e)}", exc_info=True)
+        return False
+
+async def send_email_alert_async(subject: str, body: str, recipients=None, html=True):
+    """
+    Send an email alert without blocking the event loop
+    
+    Uses aiosmtplib when it is installed, otherwise runs send_email_alert in a
+    worker thread.
+    
+    Args:
+        subject: Email subject line
+        body: Email body content
+        recipients: Optional list of recipient email addresses (defaults to config.ALERT_EMAIL_TO)
+        html: Whether to send as HTML (True) or plain text (False)
+    
+    Returns:
+        bool: Success status of the email sending operation
+    """
+    if aiosmtplib is None:
+        logger.debug("aiosmtplib not installed, sending email alert from a worker thread")
+        return await asyncio.to_thread(send_email_alert, subject, body, recipients, html)
+    
+    recipient_list = get_alert_recipients(recipients)
+    if recipient_list is None:
+        return False
+    
+    try:
+        msg = build_alert_message(subject, body, recipient_list, html)
         
-        # Send email
-        server.send_message(msg)
-        server.quit()
+        smtp_port = getattr(config, "SMTP_PORT", 587)
+        async with aiosmtplib.SMTP(hostname=config.SMTP_HOST, port=smtp_port, start_tls=True) as smtp:
+            # Login if credentials are provided
+            if hasattr(config, "SMTP_USER") and hasattr(config, "SMTP_PASSWORD") and config.SMTP_USER:
+                await smtp.login(config.SMTP_USER, config.SMTP_PASSWORD)
+            
+            await smtp.send_message(msg)
         
         logger.info(f"Email alert sent successfully to {', '.join(recipient_list)}")
         return True
@@ -90,9 +228,26 @@ def send_email_alert(subject: str, body: str, recipients=None, html=True):
         logger.error(f"Failed to send email alert: {str(e)}", exc_info=True)
         return False
 
-def send_success_alert(new_count=0, released_count=0, details=""):
+async def broadcast_email_alert(subject: str, body: str, recipients, html=True):
     """
-    Send a success alert about a completed scraper run
+    Send an email alert to each recipient separately, concurrently
+    
+    Args:
+        subject: Email subject line
+        body: Email body content
+        recipients: List of recipient email addresses
+        html: Whether to send as HTML (True) or plain text (False)
+    
+    Returns:
+        list: Success status for each recipient, in order
+    """
+    return await asyncio.gather(
+        *(send_email_alert_async(subject, body, [recipient], html) for recipient in recipients)
+    )
+
+def build_success_alert(new_count=0, released_count=0, details=""):
+    """
+    Build the subject and body of a success alert
     
     Args:
         new_count: Number of new inmates found
@@ -100,65 +255,107 @@ def send_success_alert(new_count=0, released_count=0, details=""):
         details: Any additional details to include
         
     Returns:
-        bool: Success status of the email sending operation
+        tuple: (subject, body)
     """
     subject = f"SUCCESS: Jail Roster Scraper - {new_count} New Inmates"
     
-    body = f"""
-    <html>
-    <body>
-        <h2>Jail Roster Scraper Completed Successfully</h2>
-        <ul>
-            <li><strong>{new_count}</strong> new inmates found and processed</li>
-            <li><strong>{released_count}</strong> inmates marked as released</li>
-        </ul>
+    body = SUCCESS_ALERT_TEMPLATE.format(
+        new_count=new_count, released_count=released_count, details=details
+    )
+    
+    return subject, body
+
+def build_error_alert(error_message, traceback=""):
+    """
+    Build the subject and body of an error alert
+    
+    Args:
+        error_message: The error message
+        traceback: Optional traceback information
         
-        {details}
-    </body>
-    </html>
+    Returns:
+        tuple: (subject, body)
+    """
+    subject = "ERROR: Jail Roster Scraper Failed"
+    
+    traceback_section = TRACEBACK_SECTION_TEMPLATE.format(traceback=traceback) if traceback else ""
+    body = ERROR_ALERT_TEMPLATE.format(
+        error_message=error_message, traceback_section=traceback_section
+    )
+    
+    return subject, body
+
+def send_success_alert(new_count=0, released_count=0, details="", session=None):
     """
+    Send a success alert about a completed scraper run
     
-    return send_email_alert(subject, body)
+    Args:
+        new_count: Number of new inmates found
+        released_count: Number of released inmates found
+        details: Any additional details to include
+        session: Optional open SMTP connection from smtp_session()
+        
+    Returns:
+        bool: Success status of the email sending operation
+    """
+    subject, body = build_success_alert(new_count, released_count, details)
+    return send_email_alert(subject, body, session=session)
 
-def send_error_alert(error_message, traceback=""):
+def send_error_alert(error_message, traceback="", session=None):
     """
     Send an error alert about a failed scraper run
     
     Args:
         error_message: The error message
         traceback: Optional traceback information
+        session: Optional open SMTP connection from smtp_session()
         
     Returns:
         bool: Success status of the email sending operation
     """
-    subject = "ERROR: Jail Roster Scraper Failed"
+    subject, body = build_error_alert(error_message, traceback)
+    return send_email_alert(subject, body, session=session)
+
+async def send_success_alert_async(new_count=0, released_count=0, details=""):
+    """
+    Send a success alert about a completed scraper run without blocking the event loop
     
-    body = f"""
-    <html>
-    <body>
-        <h2>Jail Roster Scraper Error</h2>
-        <p>The scraper encountered an error during execution:</p>
-        
-        <div style="background-color: #ffeeee; padding: 10px; border: 1px solid #ffcccc;">
-            <pre>{error_message}</pre>
-        </div>
-        
-        {f'<h3>Traceback</h3><pre>{traceback}</pre>' if traceback else ''}
+    Args:
+        new_count: Number of new inmates found
+        released_count: Number of released inmates found
+        details: Any additional details to include
         
-        <p>Please check the log files for more details.</p>
-    </body>
-    </html>
+    Returns:
+        bool: Success status of the email sending operation
+    """
+    subject, body = build_success_alert(new_count, released_count, details)
+    return await send_email_alert_async(subject, body)
+
+async def send_error_alert_async(error_message, traceback=""):
     """
+    Send an error alert about a failed scraper run without blocking the event loop
     
-    return send_email_alert(subject, body)
+    Args:
+        error_message: The error message
+        traceback: Optional traceback information
+        
+    Returns:
+        bool: Success status of the email sending operation
+    """
+    subject, body = build_error_alert(error_message, traceback)
+    return await send_email_alert_async(subject, body)
 
 # Test code when run directly
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     
-    # Simple test
-    if send_success_alert(5, 2, "Test success alert"):
-        print("Success alert sent")
-    
-    if send_error_alert("Test error", "Sample\nTraceback\nInfo"):
-        print("Error alert sent")
\ No newline at end of file
+    # Simple test, sending both alerts over a single connection
+    if config.ENABLE_EMAIL_ALERTS and config.SMTP_HOST:
+        with smtp_session() as session:
+            if send_success_alert(5, 2, "Test success alert", session=session):
+                print("Success alert sent")
+            
+            if send_error_alert("Test error", "Sample\nTraceback\nInfo", session=session):
+                print("Error alert sent")
+    else:
+        print("Email alerts are not configured")
\ No newline at end of file
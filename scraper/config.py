@@ -32,6 +32,16 @@ ERROR_LOG.parent.mkdir(parents=True, exist_ok=True)
 
 # Browser configuration
 BROWSER_TIMEOUT = int(os.getenv("BROWSER_TIMEOUT", 30000))
+# Number of browser pages used to scrape inmate details concurrently
+DETAIL_CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", 4))
+# Set to False for roster sites that render server-side, skipping script execution
+BROWSER_JAVASCRIPT = os.getenv("BROWSER_JAVASCRIPT", "True").lower() == "true"
+# URL of an inmate's detail page with a {name_number} placeholder, e.g.
+# https://jailroster.mctx.org/inmate?id={name_number}; when unset, details are
+# opened by clicking the inmate's roster row
+DETAIL_URL_TEMPLATE = os.getenv("DETAIL_URL_TEMPLATE", "")
+# Save a screenshot of the page on scrape failures (one per kind of failure per run)
+DEBUG_SCREENSHOTS = os.getenv("DEBUG_SCREENSHOTS", "False").lower() == "true"
 
 # Email alert configuration
 ENABLE_EMAIL_ALERTS = os.getenv("ENABLE_EMAIL_ALERTS", "False").lower() == "true"
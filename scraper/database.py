@@ -1,6 +1,8 @@
+import atexit
 import sqlite3
 import logging
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
 
 # Import local configuration
@@ -9,6 +11,111 @@ import config
 # Get logger
 logger = logging.getLogger(__name__)
 
+# Connection shared by all functions in this module, opened on first use
+_connection = None
+
+# IDs of processed inmates, loaded by load_processed_ids and kept in sync by the mark functions
+_processed_ids = None
+
+def get_connection():
+    """
+    Get the shared connection to the state database, opening it on first use.
+    
+    Returns:
+        sqlite3.Connection: The open connection
+    """
+    global _connection
+    
+    if _connection is None:
+        # Not tied to the opening thread so callers can run queries via
+        # asyncio.to_thread; access is still one call at a time
+        conn = sqlite3.connect(config.STATE_DB, check_same_thread=False)
+        
+        # WAL mode is persistent and set in initialize_database; these apply per connection
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        conn.execute("PRAGMA mmap_size=268435456")
+        
+        _connection = conn
+        atexit.register(close_connection)
+    
+    return _connection
+
+@contextmanager
+def transaction():
+    """
+    Run the enclosed statements in a single write transaction.
+    
+    Starts the transaction with BEGIN IMMEDIATE so the write lock is taken
+    up front, and commits on exit or rolls back on error. When nested inside
+    another transaction() block the statements join the outer transaction,
+    so several updates can share one commit.
+    
+    Yields:
+        sqlite3.Connection: The shared connection
+    """
+    conn = get_connection()
+    
+    if conn.in_transaction:
+        yield conn
+        return
+    
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+def close_connection():
+    """Close the shared database connection if it is open."""
+    global _connection
+    
+    if _connection is not None:
+        _connection.close()
+        _connection = None
+
+# Rows seen more recently than this are left alone by update_last_seen
+LAST_SEEN_REFRESH_INTERVAL = timedelta(minutes=30)
+
+# Schema version stored in PRAGMA user_version; bump when the table layout changes
+SCHEMA_VERSION = 1
+
+# Processed inmates keyed directly by name_number, without a separate rowid B-tree
+PROCESSED_INMATES_DDL = '''
+CREATE TABLE IF NOT EXISTS {table} (
+    name_number TEXT PRIMARY KEY NOT NULL,
+    first_seen_timestamp TEXT NOT NULL,
+    last_seen_timestamp TEXT NOT NULL,
+    date_released TEXT
+) WITHOUT ROWID;
+'''
+
+# Full schema, with a partial index covering only inmates still in custody
+SCHEMA_SQL = PROCESSED_INMATES_DDL.format(table="processed_inmates") + f'''
+CREATE INDEX IF NOT EXISTS idx_active ON processed_inmates(name_number)
+    WHERE date_released IS NULL;
+PRAGMA user_version = {SCHEMA_VERSION};
+'''
+
+# Rebuilds a processed_inmates table created before the schema was versioned
+MIGRATION_SQL = PROCESSED_INMATES_DDL.format(table="processed_inmates_new") + '''
+INSERT INTO processed_inmates_new
+(name_number, first_seen_timestamp, last_seen_timestamp, date_released)
+SELECT name_number,
+       COALESCE(first_seen_timestamp, last_seen_timestamp, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+       COALESCE(last_seen_timestamp, first_seen_timestamp, strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+       date_released
+FROM processed_inmates
+WHERE name_number IS NOT NULL;
+DROP TABLE processed_inmates;
+ALTER TABLE processed_inmates_new RENAME TO processed_inmates;
+'''
+
 def initialize_database():
     """
     Initialize the SQLite database and create the necessary tables if they don't exist.
@@ -18,211 +125,332 @@ def initialize_database():
     - first_seen_timestamp
     - last_seen_timestamp
     - date_released (NULL until inmate is released)
+    
+    The schema is only applied when the file's user_version is older than
+    SCHEMA_VERSION, so an up-to-date database is left untouched.
     """
+    conn = None
+    
     try:
         # Ensure the parent directory exists
         Path(config.STATE_DB).parent.mkdir(parents=True, exist_ok=True)
         
-        # Connect to the database
-        conn = sqlite3.connect(config.STATE_DB)
-        cursor = conn.cursor()
-        
-        # Create the table if it doesn't exist
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS processed_inmates (
-            name_number TEXT PRIMARY KEY,
-            first_seen_timestamp TEXT,
-            last_seen_timestamp TEXT,
-            date_released TEXT NULL
-        )
-        ''')
+        conn = get_connection()
         
-        # Commit changes and close the connection
-        conn.commit()
-        conn.close()
+        # Use write-ahead logging; this setting is stored in the database file
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            script = SCHEMA_SQL
+            
+            # Upgrade tables created before the schema was versioned
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'processed_inmates'"
+            ).fetchone()
+            if exists:
+                logger.info("Migrating processed_inmates table to WITHOUT ROWID")
+                script = MIGRATION_SQL + script
+            
+            # Apply the whole schema in one transaction
+            conn.executescript(f"BEGIN IMMEDIATE;\n{script}\nCOMMIT;")
         
         logger.info(f"Database initialized successfully at {config.STATE_DB}")
         return True
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}", exc_info=True)
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
         return False
 
+def load_processed_ids() -> set[str]:
+    """
+    Load the IDs of all previously processed inmates into memory.
+    
+    The returned set is also used by is_inmate_processed and updated as
+    inmates are marked processed, so callers can check membership in it
+    instead of querying the database per inmate.
+    
+    Returns:
+        set: Set of name_number strings for previously processed inmates
+    """
+    global _processed_ids
+    
+    try:
+        cursor = get_connection().execute("SELECT name_number FROM processed_inmates")
+        _processed_ids = {row[0] for row in cursor}
+        
+        logger.info(f"Loaded {len(_processed_ids)} previously processed inmate IDs")
+        return _processed_ids
+    except Exception as e:
+        logger.error(f"Error loading processed IDs: {str(e)}", exc_info=True)
+        return set()
+
 def is_inmate_processed(name_number: str) -> bool:
     """
     Check if an inmate has been processed before.
     
+    Uses the set from load_processed_ids when it has been loaded, and
+    falls back to querying the database otherwise.
+    
     Args:
         name_number: The unique name/booking number for the inmate
         
     Returns:
         bool: True if the inmate has been processed before, False otherwise
     """
+    if _processed_ids is not None:
+        return name_number in _processed_ids
+    
     try:
-        # Connect to the database
-        conn = sqlite3.connect(config.STATE_DB)
-        cursor = conn.cursor()
-        
         # Query for the name_number
-        cursor.execute(
+        cursor = get_connection().execute(
             "SELECT 1 FROM processed_inmates WHERE name_number = ?",
             (name_number,)
         )
         
         # Check if the query returned a result
-        result = cursor.fetchone() is not None
-        
-        # Close the connection
-        conn.close()
-        
-        return result
+        return cursor.fetchone() is not None
     except Exception as e:
         logger.error(f"Error checking if inmate {name_number} is processed: {str(e)}", exc_info=True)
         return False
 
-def mark_inmate_processed(name_number: str):
+def mark_inmate_processed(name_number: str, run_time: datetime = None):
     """
     Mark an inmate as processed in the database.
     
     Args:
         name_number: The unique name/booking number for the inmate
+        run_time: Optional timestamp of the current run (defaults to now)
     
     Returns:
         bool: True if successful, False otherwise
     """
     try:
         # Get the current timestamp
-        timestamp = datetime.now().isoformat()
-        
-        # Connect to the database
-        conn = sqlite3.connect(config.STATE_DB)
-        cursor = conn.cursor()
+        timestamp = (run_time or datetime.now()).isoformat()
         
         # Insert the inmate into the database, ignore if already exists
-        cursor.execute(
-            """
-            INSERT OR IGNORE INTO processed_inmates 
-            (name_number, first_seen_timestamp, last_seen_timestamp)
-            VALUES (?, ?, ?)
-            """,
-            (name_number, timestamp, timestamp)
-        )
+        with transaction() as conn:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO processed_inmates 
+                (name_number, first_seen_timestamp, last_seen_timestamp)
+                VALUES (?, ?, ?)
+                """,
+                (name_number, timestamp, timestamp)
+            )
         
-        # Commit changes and close the connection
-        conn.commit()
-        conn.close()
+        if _processed_ids is not None:
+            _processed_ids.add(name_number)
         
         return True
     except Exception as e:
         logger.error(f"Error marking inmate {name_number} as processed: {str(e)}", exc_info=True)
         return False
 
-def update_last_seen(processed_ids: set[str]):
+def mark_inmates_processed_bulk(name_numbers: list[str], run_time: datetime = None):
+    """
+    Mark several inmates as processed in a single transaction.
+    
+    When called inside an enclosing transaction() block, errors are re-raised
+    so the whole transaction rolls back, and the in-memory set of processed
+    IDs is left for the caller to update once the transaction commits.
+    
+    Args:
+        name_numbers: The unique name/booking numbers for the inmates
+        run_time: Optional timestamp of the current run (defaults to now)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not name_numbers:
+        return True
+    
+    nested = get_connection().in_transaction
+    
+    try:
+        # Every inmate in the batch is first and last seen at the same time
+        timestamp = (run_time or datetime.now()).isoformat()
+        
+        # Insert all inmates at once, ignoring any that already exist
+        with transaction() as conn:
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO processed_inmates 
+                (name_number, first_seen_timestamp, last_seen_timestamp)
+                VALUES (?, ?, ?)
+                """,
+                ((name_number, timestamp, timestamp) for name_number in name_numbers)
+            )
+        
+        if _processed_ids is not None and not nested:
+            _processed_ids.update(name_numbers)
+        
+        logger.info(f"Marked {len(name_numbers)} inmates as processed")
+        return True
+    except Exception as e:
+        logger.error(f"Error marking {len(name_numbers)} inmates as processed: {str(e)}", exc_info=True)
+        if nested:
+            raise
+        return False
+
+def load_roster_table(conn, name_numbers):
+    """
+    Load a set of inmate IDs into the roster_now temporary table.
+    
+    Args:
+        conn: Open connection to the state database
+        name_numbers: name_number values to load, replacing any already there
+    """
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS roster_now(name_number TEXT PRIMARY KEY) WITHOUT ROWID"
+    )
+    conn.execute("DELETE FROM roster_now")
+    conn.executemany(
+        "INSERT OR IGNORE INTO roster_now VALUES (?)",
+        ((name_number,) for name_number in name_numbers)
+    )
+
+def update_last_seen(processed_ids: set[str], run_time: datetime = None, roster_loaded: bool = False):
     """
     Update the last_seen_timestamp for inmates currently on the roster.
     
+    Rows whose timestamp is newer than LAST_SEEN_REFRESH_INTERVAL are skipped
+    to avoid rewriting pages that haven't meaningfully changed. Errors are
+    re-raised when called inside an enclosing transaction() block.
+    
     Args:
         processed_ids: Set of name_number values for inmates seen in the current run
+        run_time: Optional timestamp of the current run (defaults to now)
+        roster_loaded: Whether the caller already loaded processed_ids into roster_now
         
     Returns:
         int: Number of records updated
     """
     if not processed_ids:
         return 0
+    
+    nested = get_connection().in_transaction
         
     try:
-        # Get the current timestamp
-        timestamp = datetime.now().isoformat()
-        
-        # Connect to the database
-        conn = sqlite3.connect(config.STATE_DB)
-        cursor = conn.cursor()
+        # Get the current timestamp and the cutoff for stale rows
+        now = run_time or datetime.now()
+        timestamp = now.isoformat()
+        stale_before = (now - LAST_SEEN_REFRESH_INTERVAL).isoformat()
         
-        # Convert the set to a tuple for SQL IN clause
-        processed_ids_tuple = tuple(processed_ids)
-        
-        if len(processed_ids) == 1:
-            # Special handling for single item (SQL syntax requires trailing comma)
-            query = """
-                UPDATE processed_inmates 
-                SET last_seen_timestamp = ? 
-                WHERE name_number = ?
-            """
-            cursor.execute(query, (timestamp, next(iter(processed_ids))))
-        else:
-            # Use IN clause for multiple items
-            placeholders = ','.join(['?'] * len(processed_ids))
-            query = f"""
+        with transaction() as conn:
+            # Load the IDs into a temporary table so the update is one statement
+            if not roster_loaded:
+                load_roster_table(conn, processed_ids)
+            
+            cursor = conn.execute(
+                """
                 UPDATE processed_inmates 
                 SET last_seen_timestamp = ? 
-                WHERE name_number IN ({placeholders})
-            """
-            cursor.execute(query, (timestamp,) + processed_ids_tuple)
-        
-        # Get the number of rows updated
-        updated_count = cursor.rowcount
-        
-        # Commit changes and close the connection
-        conn.commit()
-        conn.close()
+                WHERE name_number IN (SELECT name_number FROM roster_now)
+                AND last_seen_timestamp < ?
+                """,
+                (timestamp, stale_before)
+            )
+            
+            # Get the number of rows updated
+            updated_count = cursor.rowcount
         
         logger.info(f"Updated last_seen_timestamp for {updated_count} inmates")
         return updated_count
     except Exception as e:
         logger.error(f"Error updating last_seen_timestamp: {str(e)}", exc_info=True)
+        if nested:
+            raise
         return 0
 
-def find_released_inmates(current_ids_on_roster: set[str]):
+def find_released_inmates(current_ids_on_roster: set[str], run_time: datetime = None, roster_loaded: bool = False):
     """
     Find inmates who are no longer on the roster and mark them as released.
     
+    Errors are re-raised when called inside an enclosing transaction() block.
+    
     Args:
         current_ids_on_roster: Set of name_number values for inmates on the current roster
+        run_time: Optional timestamp of the current run (defaults to now)
+        roster_loaded: Whether the caller already loaded current_ids_on_roster into roster_now
         
     Returns:
         list: List of name_numbers marked as released in this run
     """
+    nested = get_connection().in_transaction
+    
     try:
         # Get the current timestamp
-        timestamp = datetime.now().isoformat()
-        
-        # Connect to the database
-        conn = sqlite3.connect(config.STATE_DB)
-        cursor = conn.cursor()
-        
-        # Find inmates in the database not in current_ids_on_roster and not yet marked as released
-        cursor.execute(
-            """
-            SELECT name_number FROM processed_inmates 
-            WHERE date_released IS NULL 
-            AND name_number NOT IN ({})
-            """.format(','.join(['?'] * len(current_ids_on_roster))),
-            tuple(current_ids_on_roster)
-        ) if current_ids_on_roster else cursor.execute(
-            "SELECT name_number FROM processed_inmates WHERE date_released IS NULL"
-        )
+        timestamp = (run_time or datetime.now()).isoformat()
         
-        # Get the list of released inmates
-        released_inmates = [row[0] for row in cursor.fetchall()]
-        
-        # Update the date_released field for these inmates
-        if released_inmates:
-            placeholders = ','.join(['?'] * len(released_inmates))
+        with transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Load the current roster into a temporary table to compare against
+            if not roster_loaded:
+                load_roster_table(conn, current_ids_on_roster)
+            
+            # Find inmates in the database not on the roster and not yet marked as released
             cursor.execute(
-                f"""
-                UPDATE processed_inmates 
-                SET date_released = ? 
-                WHERE name_number IN ({placeholders})
-                """,
-                (timestamp,) + tuple(released_inmates)
+                """
+                SELECT name_number FROM processed_inmates WHERE date_released IS NULL
+                EXCEPT
+                SELECT name_number FROM roster_now
+                """
             )
             
-            logger.info(f"Marked {len(released_inmates)} inmates as released")
-        
-        # Commit changes and close the connection
-        conn.commit()
-        conn.close()
+            # Get the list of released inmates
+            released_inmates = [row[0] for row in cursor.fetchall()]
+            
+            # Update the date_released field for these inmates
+            if released_inmates:
+                cursor.execute(
+                    """
+                    UPDATE processed_inmates 
+                    SET date_released = ? 
+                    WHERE date_released IS NULL
+                    AND name_number NOT IN (SELECT name_number FROM roster_now)
+                    """,
+                    (timestamp,)
+                )
+                
+                logger.info(f"Marked {len(released_inmates)} inmates as released")
         
         return released_inmates
     except Exception as e:
         logger.error(f"Error finding released inmates: {str(e)}", exc_info=True)
-        return []
\ No newline at end of file
+        if nested:
+            raise
+        return []
+
+def record_run_state(new_ids: list[str], current_ids_on_roster: set[str], run_time: datetime = None):
+    """
+    Record the outcome of a scrape run in a single transaction.
+    
+    Marks the new inmates as processed, refreshes last-seen timestamps for
+    everyone on the roster, and marks inmates missing from it as released.
+    If any step fails the whole transaction is rolled back and the error
+    is raised, so a run is either recorded in full or not at all.
+    
+    Args:
+        new_ids: name_number values for inmates first seen in this run
+        current_ids_on_roster: Set of name_number values for inmates on the current roster
+        run_time: Optional timestamp of the current run (defaults to now)
+        
+    Returns:
+        list: List of name_numbers marked as released in this run
+    """
+    with transaction() as conn:
+        mark_inmates_processed_bulk(new_ids, run_time)
+        
+        # Both steps compare against the same roster, so load it once
+        load_roster_table(conn, current_ids_on_roster)
+        update_last_seen(current_ids_on_roster, run_time, roster_loaded=True)
+        released_inmates = find_released_inmates(current_ids_on_roster, run_time, roster_loaded=True)
+    
+    # Only trust the new IDs once they are committed
+    if _processed_ids is not None:
+        _processed_ids.update(new_ids)
+    
+    return released_inmates
@@ -1,16 +1,24 @@
 import asyncio
 import logging
-import sqlite3
 import traceback
 import sys
 from datetime import datetime
 from pathlib import Path
 
+# Use uvloop's faster event loop when it is installed (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Import local modules
 import config
-from scraper import initialize_browser, close_browser, scrape_main_roster, scrape_inmate_details
+from scraper import (
+    initialize_browser, close_browser, scrape_main_roster, scrape_new_inmate,
+    new_roster_context, open_roster_pages, try_static_roster, load_roster
+)
 from processor import structure_inmate_data, write_to_csv, get_output_csv_path
-from alerter import send_success_alert, send_error_alert
+from alerter import send_success_alert_async, send_error_alert_async
 
 # Configure logging
 def setup_logging():
@@ -86,6 +94,24 @@ def validate_config():
     
     return True
 
+async def process_new_inmate(inmate, page_pool):
+    """
+    Scrape and structure the details for a new inmate using a page from the pool
+    
+    Args:
+        inmate: Roster row for the inmate
+        page_pool: Queue of roster pages; one is held for the duration of the scrape
+    
+    Returns:
+        dict: Structured record, or None if the details could not be scraped
+    """
+    full_record = await scrape_new_inmate(inmate, page_pool)
+    if not full_record:
+        return None
+    
+    # Structure and clean the combined roster and detail data
+    return structure_inmate_data(full_record)
+
 async def run_hourly_scrape():
     """Main function to run the hourly scraping workflow"""
     setup_logging()
@@ -108,21 +134,26 @@ async def run_hourly_scrape():
         
         # Initialize the database
         logger.info("Initializing database")
-        from database import initialize_database, load_processed_ids, mark_inmate_processed, update_last_seen, find_released_inmates
+        from database import initialize_database, load_processed_ids, record_run_state
         initialize_database()
         
         # Load previously processed inmate IDs
         processed_ids = load_processed_ids()
         logger.info(f"Found {len(processed_ids)} previously processed inmates in database")
         
-        # Initialize browser
-        logger.info("Initializing browser")
-        playwright, browser, page = await initialize_browser()
+        # The browser is only started once it is needed
+        playwright = browser = None
         
         try:
-            # Scrape the main roster
+            # Read the roster without a browser when the site renders it server-side
             logger.info(f"Scraping main roster from {config.ROSTER_URL}")
-            inmates = await scrape_main_roster(page)
+            inmates = await try_static_roster()
+            
+            if not inmates:
+                # Initialize browser
+                logger.info("Initializing browser")
+                playwright, browser, page = await initialize_browser()
+                inmates = await scrape_main_roster(page)
             
             if not inmates:
                 logger.error("No inmates found or error scraping the roster")
@@ -133,42 +164,43 @@ async def run_hourly_scrape():
             # Get all name numbers currently on the roster
             name_numbers_on_roster = set(inmate['name_number'] for inmate in inmates)
             
-            # Process inmates
-            for inmate in inmates:
-                name_number = inmate["name_number"]
+            # Inmates not seen in any previous run
+            new_inmates = [inmate for inmate in inmates if inmate["name_number"] not in processed_ids]
+            new_count = len(new_inmates)
+            
+            if new_inmates:
+                # Detail views need the roster open in a browser
+                if browser is None:
+                    logger.info("Initializing browser")
+                    playwright, browser, page = await initialize_browser()
+                    await load_roster(page)
                 
-                # Check if this is a new inmate
-                if name_number not in processed_ids:
-                    logger.info(f"Processing NEW inmate: {name_number}")
-                    new_count += 1
-                    
-                    # Get detailed information for the new inmate
-                    details = await scrape_inmate_details(page, name_number)
-                    
-                    if details:
-                        # Combine main roster data and detail data
-                        raw_record = {**inmate, **details}
-                        
-                        # Structure and clean the data
-                        structured_record = structure_inmate_data(raw_record)
-                        structured_record['timestamp_processed_utc'] = datetime.utcnow().isoformat()
-                        
-                        # Add to new inmates list
-                        new_inmate_records.append(structured_record)
-                        mark_inmate_processed(name_number)
-                        
-                        logger.info(f"Successfully processed details for NEW inmate: {name_number}")
-                    else:
-                        logger.warning(f"Failed to get details for NEW inmate: {name_number}")
-                        # Still mark as processed to avoid repeated attempts
-                        mark_inmate_processed(name_number)
+                # Pool of roster pages so several detail scrapes can run at once
+                page_pool = asyncio.Queue()
+                page_pool.put_nowait(page)
+                extra_pages = min(getattr(config, "DETAIL_CONCURRENCY", 1), new_count) - 1
+                open_context = lambda: new_roster_context(browser)
+                for _, extra_page in await open_roster_pages(open_context, max(extra_pages, 0)):
+                    page_pool.put_nowait(extra_page)
+                
+                logger.info(f"Scraping details for {new_count} new inmates using {page_pool.qsize()} pages")
+                results = await asyncio.gather(
+                    *(process_new_inmate(inmate, page_pool) for inmate in new_inmates),
+                    return_exceptions=True
+                )
+                
+                for inmate, result in zip(new_inmates, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error processing NEW inmate {inmate['name_number']}: {str(result)}")
+                    elif result:
+                        new_inmate_records.append(result)
             
             logger.info(f"Found {new_count} new inmates")
             
             # Write new inmate records to CSV if there are any
             if new_inmate_records:
                 csv_path = get_output_csv_path()
-                success = write_to_csv(new_inmate_records, csv_path)
+                success = await asyncio.to_thread(write_to_csv, new_inmate_records, csv_path)
                 
                 if success:
                     logger.info(f"Successfully appended {len(new_inmate_records)} new records to {csv_path}")
@@ -177,12 +209,17 @@ async def run_hourly_scrape():
             else:
                 logger.info("No new inmates found this run")
             
-            # Update last seen timestamp for all current inmates
-            update_last_seen(name_numbers_on_roster)
-            logger.info(f"Updated last seen timestamp for {len(name_numbers_on_roster)} inmates")
+            # Record this run's state changes in a single transaction, all stamped
+            # with the time the run started. Every new inmate is marked processed,
+            # including those whose details could not be scraped to avoid repeated
+            # attempts, and inmates no longer on the roster are marked released
+            released_inmates = await asyncio.to_thread(
+                record_run_state,
+                [inmate["name_number"] for inmate in new_inmates],
+                name_numbers_on_roster,
+                start_time
+            )
             
-            # Find released inmates (no longer on roster)
-            released_inmates = find_released_inmates(name_numbers_on_roster)
             if released_inmates:
                 released_count = len(released_inmates)
                 logger.info(f"Found {released_count} inmates who were released")
@@ -204,11 +241,12 @@ async def run_hourly_scrape():
                         details += f"<h3>Released Inmates ({released_count})</h3>"
                         # You might want to fetch more info about released inmates here
                     
-                    send_success_alert(new_count, released_count, details)
+                    await send_success_alert_async(new_count, released_count, details)
             
         finally:
             # Ensure browser is closed even if an error occurs
-            await close_browser(playwright, browser)
+            if browser is not None:
+                await close_browser(playwright, browser)
             
         end_time = datetime.now()
         duration = end_time - start_time
@@ -220,7 +258,7 @@ async def run_hourly_scrape():
         # Send error alert
         if hasattr(config, "ENABLE_EMAIL_ALERTS") and config.ENABLE_EMAIL_ALERTS:
             tb_str = traceback.format_exc()
-            send_error_alert(str(e), tb_str)
+            await send_error_alert_async(str(e), tb_str)
             
         # Exit with error code for cron monitoring
         sys.exit(1)
@@ -234,4 +272,7 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
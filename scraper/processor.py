@@ -1,5 +1,7 @@
+import atexit
 import csv
 import logging
+import os
 import re
 from datetime import datetime
 from pathlib import Path
@@ -11,18 +13,37 @@ import config
 # Get logger
 logger = logging.getLogger(__name__)
 
+# Matches "City, ST 12345" or "City ST 12345-6789" at the end of an address
+CITY_STATE_ZIP_PATTERN = re.compile(r"([^,]+),?\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)")
+
+# Matches a whole "Street, City, ST 12345" address, with commas or newlines between parts
+FULL_ADDRESS_PATTERN = re.compile(
+    r"\s*([^,\n]+?)\s*[,\n]\s*([^,\n]+?)\s*[,\n]\s*([A-Z]{2})\s+(\d{5}(?:-\d{4})?)\s*"
+)
+
+# Buffer size for CSV appends, so a batch is written with few write() calls
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+# Fields every structured record has, defaulting to an empty string
+REQUIRED_FIELDS = (
+    "dob", "street_address", "city", "state", "zip",
+    "number_of_charges", "scrape_timestamp_utc"
+)
+
 def structure_inmate_data(detail_data: Dict) -> Dict:
     """
     Structure and clean raw inmate data for output.
     
+    The dictionary is updated in place, so callers that need to keep the
+    raw data should pass a copy.
+    
     Args:
         detail_data: Raw dictionary from scrape_inmate_details
         
     Returns:
-        dict: Structured and cleaned data ready for CSV output
+        dict: The same dictionary, structured and cleaned for CSV output
     """
-    # Create a copy to avoid modifying the original
-    structured_data = detail_data.copy()
+    structured_data = detail_data
     
     try:
         # Process address into components if it's a combined field
@@ -32,33 +53,43 @@ def structure_inmate_data(detail_data: Dict) -> Dict:
             # Try to parse address if city/state/zip are not already separate fields
             if not (structured_data.get("city") and structured_data.get("state") and structured_data.get("zip")):
                 try:
-                    # Look for patterns like "123 Main St, Houston, TX 77001"
-                    # Or "123 Main St\nHouston, TX 77001"
-                    address = address.replace("\n", ", ")
-                    parts = address.split(",")
-                    
-                    if len(parts) >= 3:  # Full address with street, city, state/zip
-                        structured_data["street_address"] = parts[0].strip()
-                        structured_data["city"] = parts[1].strip()
+                    # Fast path: "123 Main St, Houston, TX 77001" or
+                    # "123 Main St\nHouston, TX 77001" in a single match
+                    full_match = FULL_ADDRESS_PATTERN.fullmatch(address)
+                    if full_match:
+                        street_address, city, state, zip_code = full_match.groups()
+                        structured_data["street_address"] = street_address
+                        structured_data["city"] = city
+                        structured_data["state"] = state
+                        structured_data["zip"] = zip_code
+                    else:
+                        # Look for patterns like "123 Main St, Houston, TX 77001"
+                        # Or "123 Main St\nHouston, TX 77001"
+                        address = address.replace("\n", ", ")
+                        parts = address.split(",")
                         
-                        # Handle "State Zip" in the last part
-                        state_zip = parts[2].strip().split()
-                        if len(state_zip) >= 2:
-                            structured_data["state"] = state_zip[0].strip()
-                            structured_data["zip"] = state_zip[-1].strip()
-                    elif len(parts) == 2:  # Maybe just street and city/state/zip
-                        structured_data["street_address"] = parts[0].strip()
+                        if len(parts) >= 3:  # Full address with street, city, state/zip
+                            structured_data["street_address"] = parts[0].strip()
+                            structured_data["city"] = parts[1].strip()
                         
-                        # Try to parse city, state, zip from second part
-                        location = parts[1].strip()
-                        city_state_zip_match = re.search(r"([^,]+),?\s+([A-Z]{2})\s+(\d{5}(?:-\d{4})?)", location)
-                        if city_state_zip_match:
-                            structured_data["city"] = city_state_zip_match.group(1).strip()
-                            structured_data["state"] = city_state_zip_match.group(2).strip()
-                            structured_data["zip"] = city_state_zip_match.group(3).strip()
-                    else:
-                        # Couldn't parse effectively, just keep the full address
-                        structured_data["street_address"] = address
+                            # Handle "State Zip" in the last part
+                            state_zip = parts[2].strip().split()
+                            if len(state_zip) >= 2:
+                                structured_data["state"] = state_zip[0].strip()
+                                structured_data["zip"] = state_zip[-1].strip()
+                        elif len(parts) == 2:  # Maybe just street and city/state/zip
+                            structured_data["street_address"] = parts[0].strip()
+                        
+                            # Try to parse city, state, zip from second part
+                            location = parts[1].strip()
+                            city_state_zip_match = CITY_STATE_ZIP_PATTERN.search(location)
+                            if city_state_zip_match:
+                                structured_data["city"] = city_state_zip_match.group(1).strip()
+                                structured_data["state"] = city_state_zip_match.group(2).strip()
+                                structured_data["zip"] = city_state_zip_match.group(3).strip()
+                        else:
+                            # Couldn't parse effectively, just keep the full address
+                            structured_data["street_address"] = address
                 except Exception as parse_error:
                     logger.warning(f"Error parsing address: {str(parse_error)}")
                     structured_data["street_address"] = address
@@ -74,20 +105,15 @@ def structure_inmate_data(detail_data: Dict) -> Dict:
             structured_data["scrape_timestamp_utc"] = datetime.utcnow().isoformat()
         
         # Ensure all required fields exist with defaults
-        required_fields = [
-            "dob", "street_address", "city", "state", "zip", 
-            "number_of_charges", "scrape_timestamp_utc"
-        ]
-        
-        for field in required_fields:
-            if field not in structured_data or structured_data[field] is None:
+        for field in REQUIRED_FIELDS:
+            if structured_data.get(field) is None:
                 structured_data[field] = ""
         
         return structured_data
         
     except Exception as e:
         logger.error(f"Error structuring inmate data: {str(e)}", exc_info=True)
-        # Return the original data if processing fails
+        # Return the data as far as it was processed
         return detail_data
 
 def get_output_csv_path() -> Path:
@@ -121,10 +147,157 @@ def get_output_csv_path() -> Path:
         # Return a default path if there's an error
         return Path("data/inmates_output.csv")
 
+class CsvAppender:
+    """
+    Keeps a CSV file open for appending so repeated batches share one writer.
+    
+    The file is opened and its header resolved on the first append: an
+    existing header is reused so new rows line up with it, otherwise the
+    header is built from the first batch and written. A batch with columns
+    the header lacks, such as extra charge slots, widens the header by
+    rewriting the file before it is written.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.fh = None
+        self.writer = None
+        self.fieldnames = None
+    
+    def open(self, records: List[Dict]):
+        """
+        Open the file and set up the writer, using records to build a new header.
+        
+        Args:
+            records: First batch of flattened records to be written
+        """
+        # Check if file exists to determine if we need to write headers
+        file_exists = self.path.exists() and self.path.stat().st_size > 0
+        
+        if file_exists:
+            # Appended rows must match the columns already in the file
+            with open(self.path, newline='', encoding='utf-8') as existing:
+                self.fieldnames = next(csv.reader(existing), [])
+        else:
+            # Union of all field names, in the order they first appear
+            self.fieldnames = list({key: None for record in records for key in record})
+        
+        self.fh = open(self.path, 'a', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_SIZE)
+        
+        self.writer = csv.DictWriter(self.fh, fieldnames=self.fieldnames, quoting=csv.QUOTE_MINIMAL)
+        
+        # Only write header if file is new or empty
+        if not file_exists:
+            self.writer.writeheader()
+    
+    def append(self, records: List[Dict]):
+        """
+        Write a batch of flattened records.
+        
+        Args:
+            records: Flattened record dictionaries
+        """
+        if self.writer is None:
+            self.open(records)
+        
+        # Columns the header doesn't have yet, in the order they first appear
+        new_fields = [
+            key for key in {key: None for record in records for key in record}
+            if key not in self.fieldnames
+        ]
+        if new_fields:
+            self.widen(new_fields)
+        
+        self.writer.writerows(records)
+    
+    def widen(self, new_fields: List[str]):
+        """
+        Add columns to the header, rewriting the rows already in the file.
+        
+        Args:
+            new_fields: Column names to add after the existing ones
+        """
+        logger.info(f"Adding columns {new_fields} to {self.path}, rewriting existing rows")
+        fieldnames = self.fieldnames + new_fields
+        self.close()
+        
+        # Write the widened copy alongside and swap it in, so a failure leaves the original intact
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(self.path, newline='', encoding='utf-8') as source, \
+                open(temp_path, 'w', newline='', encoding='utf-8') as target:
+            writer = csv.DictWriter(target, fieldnames=fieldnames, quoting=csv.QUOTE_MINIMAL)
+            writer.writeheader()
+            for row in csv.DictReader(source):
+                # Values past the end of the old header had no column to go in
+                row.pop(None, None)
+                writer.writerow(row)
+        os.replace(temp_path, self.path)
+        
+        # Reopen for appending, picking up the widened header from the file
+        self.open([])
+    
+    def flush(self, sync: bool = False):
+        """
+        Flush buffered rows to the OS, and to disk if sync is set.
+        
+        Args:
+            sync: Whether to fsync the file after flushing
+        """
+        if self.fh is None:
+            return
+        
+        self.fh.flush()
+        if sync:
+            os.fsync(self.fh.fileno())
+    
+    def close(self):
+        """Flush and sync any written rows and close the file."""
+        if self.fh is None:
+            return
+        
+        try:
+            self.flush(sync=True)
+        finally:
+            self.fh.close()
+            self.fh = None
+            self.writer = None
+
+# Open appenders by output path, closed at interpreter exit
+csv_appenders: Dict[Path, CsvAppender] = {}
+
+def get_csv_appender(output_path: Path) -> CsvAppender:
+    """
+    Get the appender for a CSV file, creating it on first use.
+    
+    Args:
+        output_path: Path of the CSV file
+    
+    Returns:
+        CsvAppender: The appender for that file
+    """
+    output_path = Path(output_path)
+    
+    if output_path not in csv_appenders:
+        csv_appenders[output_path] = CsvAppender(output_path)
+    
+    return csv_appenders[output_path]
+
+@atexit.register
+def close_csv_appenders():
+    """Close every open CSV appender."""
+    for appender in csv_appenders.values():
+        try:
+            appender.close()
+        except Exception as e:
+            logger.error(f"Error closing CSV file {appender.path}: {str(e)}")
+
 def write_to_csv(records: List[Dict], output_path: Path = None) -> bool:
     """
     Write inmate records to a CSV file.
     
+    Records are expected to have been passed through structure_inmate_data
+    already; any that are missing required fields are structured here.
+    
     Args:
         records: List of structured inmate data dictionaries
         output_path: Optional path override (defaults to config path)
@@ -147,8 +320,10 @@ def write_to_csv(records: List[Dict], output_path: Path = None) -> bool:
         # Process records to flatten charge data
         flattened_records = []
         for record in records:
-            # Structure and clean the data
-            structured_record = structure_inmate_data(record)
+            # Structure and clean the data unless the caller already did
+            structured_record = record
+            if not all(field in record for field in REQUIRED_FIELDS):
+                structured_record = structure_inmate_data(record)
             
             # Create a flattened version (without nested lists)
             flat_record = {k: v for k, v in structured_record.items() if k != "charges"}
@@ -164,26 +339,11 @@ def write_to_csv(records: List[Dict], output_path: Path = None) -> bool:
             
             flattened_records.append(flat_record)
         
-        # Get all possible field names from all records
-        fieldnames = set()
-        for record in flattened_records:
-            fieldnames.update(record.keys())
-        
-        # Sort fieldnames for consistent output
-        fieldnames = sorted(list(fieldnames))
-        
-        # Check if file exists to determine if we need to write headers
-        file_exists = output_path.exists() and output_path.stat().st_size > 0
-        
-        with open(output_path, 'a', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            # Only write header if file is new or empty
-            if not file_exists:
-                writer.writeheader()
-            
-            # Write all records
-            writer.writerows(flattened_records)
+        # Append through the long-lived writer for this file, pushing the batch
+        # out to the OS now and leaving fsync for when it is closed at exit
+        appender = get_csv_appender(output_path)
+        appender.append(flattened_records)
+        appender.flush()
         
         logger.info(f"Successfully wrote {len(records)} records to {output_path}")
         return True
@@ -1,43 +1,203 @@
 import asyncio
+import atexit
 import logging
 import sqlite3
+import time
 import os
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from pathlib import Path
 from playwright.async_api import async_playwright, Page, Locator, TimeoutError as PlaywrightTimeoutError
 
+# Use uvloop's faster event loop when it is installed (not available on Windows)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Optional static fetch path for roster sites that render server-side
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Optional HTML parser for pages fetched without rendering them
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # Import local modules
 import config
 
 # Get logger
 logger = logging.getLogger(__name__)
 
-# Ensure screenshots directory exists
+# Debug screenshots are written here when config.DEBUG_SCREENSHOTS is set
 SCREENSHOTS_DIR = Path(__file__).parent / "debug_screenshots"
-SCREENSHOTS_DIR.mkdir(exist_ok=True, parents=True)
+
+# Failure classes already captured this run, so error storms save one screenshot each
+captured_screenshots: Set[str] = set()
+
+# Either roster table layout - these selectors need verification against the live site
+ROSTER_TABLE_SELECTORS = "table#inmateTable, table.inmates-list"
+
+# Rows of either roster table layout
+ROSTER_ROW_SELECTORS = "table#inmateTable tbody tr, table.inmates-list tbody tr"
+
+# Resource types not needed to read the roster, aborted to speed up page loads.
+# Stylesheets are kept because visibility checks on clicks and the detail pane depend on them
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "ping"})
+
+# Analytics and tracking hosts whose scripts and beacons are aborted
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com", "doubleclick.net")
+
+# Roster table columns, in order - the column order needs verification against the actual site structure
+ROSTER_FIELDS = (
+    "last_name", "first_name", "middle_name", "suffix", "age",
+    "race", "gender", "date_confined", "name_number"
+)
+
+# Name parts joined, in order, to build full_name
+FULL_NAME_FIELDS = ("first_name", "middle_name", "last_name", "suffix")
+
+# Returns the text of each row's cells, as a list per row
+ROW_CELL_TEXT_JS = "rows => rows.map(row => Array.from(row.cells, cell => cell.textContent))"
+
+# Returns the index of the first row whose cell at `column` has the given text, or -1
+FIND_ROW_JS = """
+(rows, [column, text]) => rows.findIndex(row =>
+    row.cells.length > column && (row.cells[column].textContent || "").trim() === text
+)
+"""
+
+# Returns [total, rows] where rows holds the trimmed text of each field selector
+# for the first `limit` elements ("" when a selector matches nothing)
+CHARGE_FIELDS_JS = """
+(elements, [selectors, limit]) => [
+    elements.length,
+    elements.slice(0, limit).map(element => selectors.map(selector => {
+        const child = element.querySelector(selector);
+        return child ? (child.textContent || "").trim() : "";
+    }))
+]
+"""
+
+# Containers the detail view may appear in - these need verification against the live site
+DETAIL_PANE_SELECTORS = (
+    "div.inmateDetails",  # Example primary selector
+    "div.modal-dialog",   # Example alternative selector
+    "div.detail-pane",    # Another possible selector
+    "#detailsPanel"       # Another possibility
+)
+
+# Union of the detail view candidates, so they can be waited on together
+DETAIL_PANE_SELECTOR = ", ".join(DETAIL_PANE_SELECTORS)
+
+# Personal and location fields read from the detail view
+DETAIL_FIELD_SELECTORS = {
+    "dob": "div.inmateDetails .dob",
+    "address": "div.inmateDetails .address",
+    "location": "div.inmateDetails .location",  # Combined "City, State Zip"
+    "city": "div.inmateDetails .city",
+    "state": "div.inmateDetails .state",
+    "zip": "div.inmateDetails .zip",
+}
+
+# Returns the trimmed text of the first match of each field's selector ("" when nothing matches)
+DETAIL_FIELDS_JS = """
+selectors => Object.fromEntries(Object.entries(selectors).map(([field, selector]) => {
+    const element = document.querySelector(selector);
+    return [field, element ? (element.textContent || "").trim() : ""];
+}))
+"""
+
+# Elements that may hold one charge each, tried in order
+CHARGE_CONTAINER_SELECTORS = (
+    "div.charges .charge-item",  # Example selector
+    "table.charges-table tbody tr",  # Alternative table structure
+    "div.inmate-charges .charge",  # Another possibility
+)
+
+# Most charges kept per inmate
+MAX_CHARGES = 5
+
+# Fields extracted for each charge, and where to find them in each layout
+CHARGE_FIELDS = ("description", "offense_date", "court_reference", "disposition")
+CHARGE_ROW_SELECTORS = ("td:nth-child(1)", "td:nth-child(2)", "td:nth-child(3)", "td:nth-child(4)")
+CHARGE_DIV_SELECTORS = (
+    ".charge-description, .description",
+    ".offense-date, .date",
+    ".court-reference, .court",
+    ".disposition, .status",
+)
+
+# Connection settings applied to every state database connection. WAL lets
+# readers run alongside the writer; it is persistent but cheap to reassert
+STATE_DB_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA busy_timeout=30000;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-20000;
+"""
+
+# Connection shared by the database functions, opened on first use
+_db_conn = None
 
 # Database functions
-def setup_database():
+def connect_state_db() -> sqlite3.Connection:
+    """
+    Open a connection to the state database with the tuned settings applied.
+    
+    Returns:
+        sqlite3.Connection: The open connection
+    """
+    conn = sqlite3.connect(config.STATE_DB, check_same_thread=False)
+    conn.executescript(STATE_DB_PRAGMAS)
+    return conn
+
+def get_db() -> sqlite3.Connection:
+    """
+    Get the shared state database connection, opening it on first use.
+    
+    Returns:
+        sqlite3.Connection: The shared connection, closed at interpreter exit
+    """
+    global _db_conn
+    
+    if _db_conn is None:
+        _db_conn = connect_state_db()
+        atexit.register(close_db)
+    
+    return _db_conn
+
+def close_db():
+    """Close the shared state database connection if it is open."""
+    global _db_conn
+    
+    if _db_conn is not None:
+        _db_conn.close()
+        _db_conn = None
+
+def setup_database(conn: Optional[sqlite3.Connection] = None):
     """
     Initialize the SQLite database and create necessary tables if they don't exist.
+    
+    Args:
+        conn: Optional SQLite connection (defaults to the shared connection)
     """
     try:
-        # Connect to the database
-        conn = sqlite3.connect(config.STATE_DB)
-        cursor = conn.cursor()
+        conn = conn or get_db()
         
         # Create the processed_inmates table if it doesn't exist
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS processed_inmates (
-            name_number TEXT PRIMARY KEY,
-            processed_timestamp TEXT
-        )
-        ''')
-        
-        # Commit changes and close connection
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS processed_inmates (
+                name_number TEXT PRIMARY KEY,
+                processed_timestamp TEXT
+            )
+            ''')
         
         logger.info(f"Database setup complete at {config.STATE_DB}")
         return True
@@ -45,32 +205,24 @@ def setup_database():
         logger.error(f"Database setup error: {str(e)}", exc_info=True)
         return False
 
-def load_processed_ids() -> Set[str]:
+def load_processed_ids(conn: Optional[sqlite3.Connection] = None) -> Set[str]:
     """
     Load all previously processed inmate IDs from the database.
     
+    Args:
+        conn: Optional SQLite connection (defaults to the shared connection)
+    
     Returns:
         set: Set of name_number strings for previously processed inmates
     """
-    processed_ids = set()
     retry_count = 0
     max_retries = 2
     
     while retry_count <= max_retries:
         try:
-            # Connect to the database
-            conn = sqlite3.connect(config.STATE_DB)
-            cursor = conn.cursor()
-            
             # Query all processed inmate IDs
-            cursor.execute("SELECT name_number FROM processed_inmates")
-            
-            # Add each ID to the set
-            for row in cursor.fetchall():
-                processed_ids.add(row[0])
-            
-            # Close the connection
-            conn.close()
+            cursor = (conn or get_db()).execute("SELECT name_number FROM processed_inmates")
+            processed_ids = {row[0] for row in cursor}
             
             logger.info(f"Loaded {len(processed_ids)} previously processed inmate IDs")
             return processed_ids
@@ -80,7 +232,7 @@ def load_processed_ids() -> Set[str]:
             if retry_count <= max_retries:
                 logger.warning(f"Database operational error (retry {retry_count}/{max_retries}): {str(oe)}")
                 # Short delay before retry
-                asyncio.sleep(1)
+                time.sleep(1)
             else:
                 logger.error(f"Database operational error after {max_retries} retries: {str(oe)}")
                 return set()
@@ -88,6 +240,52 @@ def load_processed_ids() -> Set[str]:
             logger.error(f"Error loading processed IDs: {str(e)}", exc_info=True)
             return set()
 
+def find_unprocessed_ids(name_numbers, conn: Optional[sqlite3.Connection] = None) -> Set[str]:
+    """
+    Find which of the given inmate IDs have not been processed yet.
+    
+    The IDs are loaded into a temporary table and filtered against
+    processed_inmates inside SQLite, so the full history of processed IDs
+    is never read into Python.
+    
+    Args:
+        name_numbers: Iterable of name_number strings scraped from the roster
+        conn: Optional SQLite connection (defaults to the shared connection)
+        
+    Returns:
+        set: The name_number strings that are not yet in the database
+    """
+    name_numbers = set(name_numbers)
+    
+    try:
+        conn = conn or get_db()
+        
+        # The temp table lives as long as the connection, so clear it on each call
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS scraped(name_number TEXT PRIMARY KEY) WITHOUT ROWID")
+        with conn:
+            conn.execute("DELETE FROM scraped")
+            conn.executemany(
+                "INSERT INTO scraped VALUES (?)",
+                ((name_number,) for name_number in name_numbers)
+            )
+        
+        cursor = conn.execute(
+            """
+            SELECT s.name_number FROM scraped s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM processed_inmates p WHERE p.name_number = s.name_number
+            )
+            """
+        )
+        unprocessed_ids = {row[0] for row in cursor}
+        
+        logger.info(f"{len(unprocessed_ids)} of {len(name_numbers)} roster inmates are not yet processed")
+        return unprocessed_ids
+    except Exception as e:
+        logger.error(f"Error finding unprocessed IDs: {str(e)}", exc_info=True)
+        # Treat every inmate as new rather than skipping them all
+        return name_numbers
+
 def mark_as_processed(conn, name_number: str):
     """
     Mark an inmate as processed in the database.
@@ -97,11 +295,10 @@ def mark_as_processed(conn, name_number: str):
         name_number: The inmate's unique name/booking number
     """
     try:
-        cursor = conn.cursor()
         timestamp = datetime.utcnow().isoformat()
         
         # Insert or ignore (if already exists)
-        cursor.execute(
+        conn.execute(
             "INSERT OR IGNORE INTO processed_inmates (name_number, processed_timestamp) VALUES (?, ?)",
             (name_number, timestamp)
         )
@@ -111,19 +308,149 @@ def mark_as_processed(conn, name_number: str):
         logger.error(f"Error marking inmate {name_number} as processed: {str(e)}", exc_info=True)
         return False
 
+def mark_all_as_processed(conn, name_numbers) -> bool:
+    """
+    Mark several inmates as processed in a single transaction.
+    
+    Args:
+        conn: SQLite connection
+        name_numbers: Iterable of the inmates' unique name/booking numbers
+    """
+    try:
+        timestamp = datetime.utcnow().isoformat()
+        
+        # One prepared insert reused for every inmate, committed once
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO processed_inmates (name_number, processed_timestamp) VALUES (?, ?)",
+                ((name_number, timestamp) for name_number in name_numbers)
+            )
+        
+        return True
+    except Exception as e:
+        logger.error(f"Error marking inmates as processed: {str(e)}", exc_info=True)
+        return False
+
 def mark_inmate_processed(name_number: str):
     """Alternative interface for marking an inmate as processed"""
     try:
-        conn = sqlite3.connect(config.STATE_DB)
-        result = mark_as_processed(conn, name_number)
-        conn.commit()
-        conn.close()
-        return result
+        conn = get_db()
+        with conn:
+            return mark_as_processed(conn, name_number)
     except Exception as e:
         logger.error(f"Error in mark_inmate_processed: {str(e)}", exc_info=True)
         return False
 
 # Scraping functions
+async def maybe_screenshot(page: Page, name: str, detail: str = "", include_html: bool = False) -> Optional[Path]:
+    """
+    Save a debug screenshot of the page, at most once per failure class per run.
+    
+    Does nothing unless config.DEBUG_SCREENSHOTS is set, and never raises.
+    
+    Args:
+        page: Playwright page object
+        name: Failure class, used as the file name prefix and to suppress repeats
+        detail: Optional extra file name part, such as the inmate's name_number
+        include_html: Whether to save the page HTML alongside the screenshot
+    
+    Returns:
+        Path: The screenshot path, or None if no screenshot was taken
+    """
+    if not getattr(config, "DEBUG_SCREENSHOTS", False) or name in captured_screenshots:
+        return None
+    captured_screenshots.add(name)
+    
+    error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = "_".join(filter(None, (name, detail, error_timestamp)))
+    screenshot_path = SCREENSHOTS_DIR / f"{stem}.png"
+    
+    try:
+        SCREENSHOTS_DIR.mkdir(exist_ok=True, parents=True)
+        await page.screenshot(path=screenshot_path)
+        logger.warning(f"Screenshot saved to {screenshot_path}")
+        
+        if include_html:
+            html_path = SCREENSHOTS_DIR / f"{stem}.html"
+            html_path.write_text(await page.content(), encoding="utf-8")
+            logger.warning(f"Page HTML saved to {html_path}")
+        
+        return screenshot_path
+    except Exception as ss_error:
+        logger.warning(f"Failed to save screenshot: {str(ss_error)}")
+        return None
+
+def parse_roster_row(cells: List[Optional[str]]) -> Optional[Dict]:
+    """
+    Build an inmate record from the text of one roster row's cells.
+    
+    Args:
+        cells: Cell text in column order
+    
+    Returns:
+        dict: Inmate data, or None if the row has no name_number
+    """
+    # Extract text from cells - these selectors need verification
+    try:
+        # Pad short rows so missing cells read as empty
+        cells = cells + [""] * (len(ROSTER_FIELDS) - len(cells))
+        
+        # Map cells to fields in column order, normalizing as we go
+        inmate_data = {field: (value or "").strip() for field, value in zip(ROSTER_FIELDS, cells)}
+        
+        # Create full name
+        inmate_data["full_name"] = " ".join(filter(None, (inmate_data[field] for field in FULL_NAME_FIELDS)))
+        
+        # Only keep inmates with a valid name_number
+        if not inmate_data["name_number"]:
+            logger.warning("Skipping inmate with no name_number")
+            return None
+        
+        return inmate_data
+        
+    except Exception as cell_error:
+        logger.warning(f"Error extracting cell data: {str(cell_error)}")
+        return None
+
+async def try_static_roster() -> List[Dict]:
+    """
+    Read the roster straight from the page HTML, without a browser.
+    
+    This only works for roster sites that render the table server-side,
+    and needs httpx and selectolax to be installed.
+    
+    Returns:
+        list: List of dictionaries containing inmate data, or an empty list if
+        the table isn't in the HTML and the browser has to be used instead
+    """
+    if httpx is None or HTMLParser is None:
+        return []
+    
+    try:
+        async with httpx.AsyncClient(timeout=config.BROWSER_TIMEOUT / 1000, follow_redirects=True) as client:
+            response = await client.get(config.ROSTER_URL)
+            response.raise_for_status()
+        
+        # Same table and columns the browser path reads
+        tree = HTMLParser(response.text)
+        inmates = []
+        for row in tree.css(ROSTER_ROW_SELECTORS):
+            cells = [cell.text() for cell in row.iter() if cell.tag in ("td", "th")]
+            inmate_data = parse_roster_row(cells)
+            if inmate_data:
+                inmates.append(inmate_data)
+        
+        if inmates:
+            logger.info(f"Read {len(inmates)} inmates from the static roster HTML")
+        else:
+            logger.info("Roster table not found in static HTML, falling back to the browser")
+        return inmates
+        
+    except Exception as e:
+        logger.warning(f"Static roster fetch failed, falling back to the browser: {str(e)}")
+        return []
+
 async def scrape_main_roster(page: Page) -> List[Dict]:
     """
     Scrape the main roster page and extract data from the inmate table.
@@ -145,25 +472,20 @@ async def scrape_main_roster(page: Page) -> List[Dict]:
             try:
                 logger.info(f"Navigating to {config.ROSTER_URL} (attempt {retry_count + 1}/{max_retries})")
                 
-                # First wait for networkidle to ensure page fully loads
-                await page.goto(config.ROSTER_URL, timeout=config.BROWSER_TIMEOUT, wait_until="networkidle")
+                # Only wait for the document; the table wait below covers readiness
+                await page.goto(config.ROSTER_URL, timeout=config.BROWSER_TIMEOUT, wait_until="domcontentloaded")
                 break  # Success, exit retry loop
                 
             except PlaywrightTimeoutError as timeout_error:
                 retry_count += 1
-                error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = SCREENSHOTS_DIR / f"page_load_timeout_{error_timestamp}.png"
+                logger.warning("Page load timed out")
                 
-                try:
-                    # Take screenshot of the current state
-                    await page.screenshot(path=screenshot_path)
-                    logger.warning(f"Page load timed out. Screenshot saved to {screenshot_path}")
-                except Exception as ss_error:
-                    logger.warning(f"Failed to save screenshot: {str(ss_error)}")
+                # Take screenshot of the current state
+                await maybe_screenshot(page, "page_load_timeout")
                 
                 if retry_count >= max_retries:
                     logger.error(f"Failed to navigate to {config.ROSTER_URL} after {max_retries} attempts")
-                    await page.screenshot(path=SCREENSHOTS_DIR / f"final_failed_load_{error_timestamp}.png")
+                    await maybe_screenshot(page, "final_failed_load")
                     raise timeout_error
                 
                 # Wait before retrying
@@ -185,59 +507,21 @@ async def scrape_main_roster(page: Page) -> List[Dict]:
                 await page.wait_for_selector(alternative_selector, timeout=config.BROWSER_TIMEOUT)
                 table_selector = alternative_selector  # Use the working selector
             except PlaywrightTimeoutError as e:
-                error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                screenshot_path = SCREENSHOTS_DIR / f"table_not_found_{error_timestamp}.png"
-                html_path = SCREENSHOTS_DIR / f"table_not_found_{error_timestamp}.html"
+                logger.error("Table not found")
                 
                 # Capture diagnostics
-                await page.screenshot(path=screenshot_path)
-                html_content = await page.content()
-                with open(html_path, "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                
-                logger.error(f"Table not found. Screenshot saved to {screenshot_path}, HTML to {html_path}")
+                await maybe_screenshot(page, "table_not_found", include_html=True)
                 raise e
         
-        # Find all inmate rows within the table body
-        rows = await page.locator(f"{table_selector} tbody tr").all()
+        # Read the text of every cell of every row in a single browser round trip
+        rows = await page.locator(f"{table_selector} tbody tr").evaluate_all(ROW_CELL_TEXT_JS)
         logger.info(f"Found {len(rows)} inmate rows")
         
         # Process each row
-        for row in rows:
-            inmate_data = {}
-            
-            # Extract text from cells - these selectors need verification
-            try:
-                # The column indices need verification against the actual site structure
-                inmate_data["last_name"] = await row.locator("td:nth-child(1)").text_content() or ""
-                inmate_data["first_name"] = await row.locator("td:nth-child(2)").text_content() or ""
-                inmate_data["middle_name"] = await row.locator("td:nth-child(3)").text_content() or ""
-                inmate_data["suffix"] = await row.locator("td:nth-child(4)").text_content() or ""
-                inmate_data["age"] = await row.locator("td:nth-child(5)").text_content() or ""
-                inmate_data["race"] = await row.locator("td:nth-child(6)").text_content() or ""
-                inmate_data["gender"] = await row.locator("td:nth-child(7)").text_content() or ""
-                inmate_data["date_confined"] = await row.locator("td:nth-child(8)").text_content() or ""
-                inmate_data["name_number"] = await row.locator("td:nth-child(9)").text_content() or ""
-                
-                # Create full name
-                full_name_parts = [inmate_data["first_name"], inmate_data["middle_name"], inmate_data["last_name"]]
-                if inmate_data["suffix"]:
-                    full_name_parts.append(inmate_data["suffix"])
-                inmate_data["full_name"] = " ".join(part for part in full_name_parts if part).strip()
-                
-                # Normalize data
-                for key in inmate_data:
-                    inmate_data[key] = inmate_data[key].strip()
-                
-                # Only add inmates with a valid name_number
-                if inmate_data["name_number"]:
-                    inmates.append(inmate_data)
-                else:
-                    logger.warning("Skipping inmate with no name_number")
-                    
-            except Exception as cell_error:
-                logger.warning(f"Error extracting cell data: {str(cell_error)}")
-                continue
+        for cells in rows:
+            inmate_data = parse_roster_row(cells)
+            if inmate_data:
+                inmates.append(inmate_data)
         
         logger.info(f"Successfully extracted data for {len(inmates)} inmates")
         return inmates
@@ -245,11 +529,7 @@ async def scrape_main_roster(page: Page) -> List[Dict]:
     except Exception as e:
         logger.error(f"Error scraping main roster: {str(e)}", exc_info=True)
         # Take screenshot of the error state
-        try:
-            error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            await page.screenshot(path=SCREENSHOTS_DIR / f"roster_error_{error_timestamp}.png")
-        except:
-            pass
+        await maybe_screenshot(page, "roster_error")
         return []
 
 async def scrape_inmate_details(page: Page, name_number: str, inmate_row_element: Optional[Locator] = None) -> Optional[Dict]:
@@ -269,21 +549,26 @@ async def scrape_inmate_details(page: Page, name_number: str, inmate_row_element
     missing_fields = []
     
     try:
+        # Fetch the detail page directly when its URL is known, skipping the click
+        if getattr(config, "DETAIL_URL_TEMPLATE", ""):
+            details = await fetch_inmate_details(page, name_number)
+            if details is not None:
+                return details
+        
         # Find the inmate row if not provided
         if inmate_row_element is None:
             # Find the row containing the name_number
             table_selector = "table#inmateTable" # This needs verification against the live site
-            rows = await page.locator(f"{table_selector} tbody tr").all()
+            rows = page.locator(f"{table_selector} tbody tr")
             
-            inmate_row_element = None
-            for row in rows:
-                # Adjust the column index based on actual site structure
-                cell_text = await row.locator("td:nth-child(9)").text_content()  # Assuming name_number is in column 9
-                if cell_text and cell_text.strip() == name_number:
-                    inmate_row_element = row
-                    break
+            # Match on the name_number column in one browser round trip instead of reading it row by row
+            row_index = await rows.evaluate_all(
+                FIND_ROW_JS, [ROSTER_FIELDS.index("name_number"), name_number]
+            )
             
-            if inmate_row_element is None:
+            if row_index >= 0:
+                inmate_row_element = rows.nth(row_index)
+            else:
                 logger.warning(f"Could not find inmate with name_number {name_number} in the roster")
                 return None
         
@@ -319,41 +604,34 @@ async def scrape_inmate_details(page: Page, name_number: str, inmate_row_element
                             logger.info("Successfully clicked element within row")
                         else:
                             # Take screenshot of the failed click
-                            error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            await page.screenshot(path=SCREENSHOTS_DIR / f"click_failed_{name_number}_{error_timestamp}.png")
+                            await maybe_screenshot(page, "click_failed", name_number)
                             return None
                     except Exception as alt_click_error:
                         logger.error(f"Alternative click strategy failed: {str(alt_click_error)}")
                         # Take screenshot of the error state
-                        error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        await page.screenshot(path=SCREENSHOTS_DIR / f"click_failed_{name_number}_{error_timestamp}.png")
+                        await maybe_screenshot(page, "click_failed", name_number)
                         return None
         
-        # Wait for the detail view to appear
+        # Wait for the detail view to appear, racing every candidate selector at once
         detail_pane = None
-        detail_selectors = [
-            "div.inmateDetails",  # Example primary selector
-            "div.modal-dialog",   # Example alternative selector
-            "div.detail-pane",    # Another possible selector
-            "#detailsPanel"       # Another possibility
-        ]
-        
-        # Try each selector
-        for selector in detail_selectors:
-            try:
-                logger.info(f"Waiting for detail pane with selector: {selector}")
-                detail_pane = await page.wait_for_selector(selector, timeout=15000)
-                if detail_pane:
-                    logger.info(f"Found detail pane with selector: {selector}")
-                    break
-            except Exception as wait_error:
-                logger.warning(f"Selector {selector} not found: {str(wait_error)}")
+        
+        try:
+            logger.info(f"Waiting for detail pane with selector: {DETAIL_PANE_SELECTOR}")
+            detail_pane = await page.wait_for_selector(DETAIL_PANE_SELECTOR, timeout=15000)
+            if detail_pane:
+                # Report which of the candidates matched
+                matched_selector = await detail_pane.evaluate(
+                    "(element, selectors) => selectors.find(selector => element.matches(selector))",
+                    list(DETAIL_PANE_SELECTORS)
+                )
+                logger.info(f"Found detail pane with selector: {matched_selector}")
+        except Exception as wait_error:
+            logger.warning(f"Detail pane not found: {str(wait_error)}")
         
         if not detail_pane:
             logger.error(f"Could not find detail view with any selector for inmate {name_number}")
             # Take screenshot of the error state
-            error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            await page.screenshot(path=SCREENSHOTS_DIR / f"detail_not_found_{name_number}_{error_timestamp}.png")
+            await maybe_screenshot(page, "detail_not_found", name_number)
             return None
         
         # Successfully found detail pane, extract information
@@ -363,93 +641,36 @@ async def scrape_inmate_details(page: Page, name_number: str, inmate_row_element
         
         # Attempt to extract each field, but continue even if some fail
         try:
-            # Basic personal information
+            # Read every personal and location field in one browser round trip
             try:
-                details["dob"] = await extract_text_or_empty(page, "div.inmateDetails .dob")
-            except Exception:
-                missing_fields.append("dob")
-                details["dob"] = ""
+                fields = await page.evaluate(DETAIL_FIELDS_JS, DETAIL_FIELD_SELECTORS)
+            except Exception as field_error:
+                logger.warning(f"Error extracting detail fields: {str(field_error)}")
+                missing_fields.extend(["dob", "address"])
+                fields = {}
             
-            try:
-                details["address"] = await extract_text_or_empty(page, "div.inmateDetails .address")
-            except Exception:
-                missing_fields.append("address")
-                details["address"] = ""
-            
-            # Try to extract city, state, zip
-            try:
-                location_text = await extract_text_or_empty(page, "div.inmateDetails .location")
-                if location_text:
-                    # Parse combined location field (common format: "City, State Zip")
-                    location_parts = location_text.split(",", 1)
-                    details["city"] = location_parts[0].strip() if len(location_parts) > 0 else ""
-                    
-                    if len(location_parts) > 1:
-                        # Try to split state and zip (common format: "State Zip")
-                        state_zip = location_parts[1].strip().split(" ", 1)
-                        details["state"] = state_zip[0].strip() if len(state_zip) > 0 else ""
-                        details["zip"] = state_zip[1].strip() if len(state_zip) > 1 else ""
-                    else:
-                        details["state"] = ""
-                        details["zip"] = ""
-                else:
-                    # Try individual fields if available
-                    details["city"] = await extract_text_or_empty(page, "div.inmateDetails .city")
-                    details["state"] = await extract_text_or_empty(page, "div.inmateDetails .state")
-                    details["zip"] = await extract_text_or_empty(page, "div.inmateDetails .zip")
-                    
-                    # Check if we found any location data
-                    if not any([details["city"], details["state"], details["zip"]]):
-                        missing_fields.append("location")
-            except Exception:
-                missing_fields.append("location")
-                details["city"] = ""
-                details["state"] = ""
-                details["zip"] = ""
+            assign_detail_fields(details, fields, missing_fields)
             
             # Extract charges - try multiple potential selectors
             charges = []
             charge_container_found = False
             
-            charge_container_selectors = [
-                "div.charges .charge-item",  # Example selector
-                "table.charges-table tbody tr",  # Alternative table structure
-                "div.inmate-charges .charge",  # Another possibility
-            ]
-            
-            for selector in charge_container_selectors:
+            for selector in CHARGE_CONTAINER_SELECTORS:
                 try:
-                    charge_elements = await page.locator(selector).all()
+                    # Table rows use column indices, div structures use class selectors
+                    field_selectors = CHARGE_ROW_SELECTORS if selector.endswith("tr") else CHARGE_DIV_SELECTORS
                     
-                    if charge_elements and len(charge_elements) > 0:
+                    # Extract every charge field of every element in one browser round trip
+                    charge_count, charge_rows = await page.locator(selector).evaluate_all(
+                        CHARGE_FIELDS_JS, [list(field_selectors), MAX_CHARGES]
+                    )
+                    
+                    if charge_count > 0:
                         charge_container_found = True
-                        logger.info(f"Found {len(charge_elements)} charges using selector: {selector}")
+                        logger.info(f"Found {charge_count} charges using selector: {selector}")
                         
-                        # Process the first few charges (limit to avoid overwhelming)
-                        for i, charge_elem in enumerate(charge_elements[:5]):  # Limit to 5 charges
-                            charge = {}
-                            
-                            # Try different ways to extract charge data
-                            if selector.endswith("tr"):  # Table row format
-                                # Table structure - use column indices
-                                try:
-                                    charge["description"] = await extract_text_from_element_or_empty(charge_elem, "td:nth-child(1)")
-                                    charge["offense_date"] = await extract_text_from_element_or_empty(charge_elem, "td:nth-child(2)")
-                                    charge["court_reference"] = await extract_text_from_element_or_empty(charge_elem, "td:nth-child(3)")
-                                    charge["disposition"] = await extract_text_from_element_or_empty(charge_elem, "td:nth-child(4)")
-                                except Exception:
-                                    charge["description"] = f"Failed to extract charge #{i+1}"
-                            else:
-                                # Div structure - use class selectors
-                                try:
-                                    charge["description"] = await extract_text_from_element_or_empty(charge_elem, ".charge-description, .description")
-                                    charge["offense_date"] = await extract_text_from_element_or_empty(charge_elem, ".offense-date, .date")
-                                    charge["court_reference"] = await extract_text_from_element_or_empty(charge_elem, ".court-reference, .court")
-                                    charge["disposition"] = await extract_text_from_element_or_empty(charge_elem, ".disposition, .status")
-                                except Exception:
-                                    charge["description"] = f"Failed to extract charge #{i+1}"
-                            
-                            charges.append(charge)
+                        for values in charge_rows:
+                            charges.append(dict(zip(CHARGE_FIELDS, values)))
                         
                         break  # Stop after finding charges with the first working selector
                     
@@ -476,48 +697,159 @@ async def scrape_inmate_details(page: Page, name_number: str, inmate_row_element
         except Exception as extraction_error:
             logger.error(f"Error extracting inmate details: {str(extraction_error)}", exc_info=True)
             # Take screenshot of the error state
-            error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            await page.screenshot(path=SCREENSHOTS_DIR / f"extraction_error_{name_number}_{error_timestamp}.png")
+            await maybe_screenshot(page, "extraction_error", name_number)
             return None
     
     except Exception as e:
         logger.error(f"Error in scrape_inmate_details: {str(e)}", exc_info=True)
         # Take screenshot of the error state
-        try:
-            error_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            await page.screenshot(path=SCREENSHOTS_DIR / f"detail_error_{name_number}_{error_timestamp}.png")
-        except:
-            pass
+        await maybe_screenshot(page, "detail_error", name_number)
         return None
 
-async def extract_text_or_empty(page: Page, selector: str) -> str:
-    """Helper function to safely extract text from an element or return empty string if not found."""
-    try:
-        element = await page.locator(selector).first
-        if element:
-            return (await element.text_content() or "").strip()
-        return ""
-    except Exception:
-        return ""
-
-async def extract_text_from_element_or_empty(element: Locator, selector: str) -> str:
-    """Helper function to safely extract text from a child element or return empty string if not found."""
-    try:
-        child = await element.locator(selector).first
-        if child:
-            return (await child.text_content() or "").strip()
-        return ""
-    except Exception:
-        return ""
+def split_location(location_text: str):
+    """
+    Split a combined "City, State Zip" location into its parts.
+    
+    Args:
+        location_text: Combined location text
+    
+    Returns:
+        tuple: (city, state, zip), with empty strings for missing parts
+    """
+    location_parts = location_text.split(",", 1)
+    city = location_parts[0].strip()
+    state = zip_code = ""
+    
+    if len(location_parts) > 1:
+        # Try to split state and zip (common format: "State Zip")
+        state_zip = location_parts[1].strip().split(" ", 1)
+        state = state_zip[0].strip()
+        zip_code = state_zip[1].strip() if len(state_zip) > 1 else ""
+    
+    return city, state, zip_code
 
-async def initialize_browser():
+def assign_detail_fields(details: Dict, fields: Dict, missing_fields: List[str]):
     """
-    Initialize and return Playwright browser and page objects.
+    Fill in personal and location fields from text read off a detail view.
+    
+    Args:
+        details: Detail dictionary to update
+        fields: Text found for each DETAIL_FIELD_SELECTORS field (missing fields read as empty)
+        missing_fields: List that "location" is added to if no location data was found
+    """
+    details["dob"] = fields.get("dob", "")
+    details["address"] = fields.get("address", "")
+    
+    # Parse combined location field if present, otherwise use individual fields
+    location_text = fields.get("location", "")
+    if location_text:
+        details["city"], details["state"], details["zip"] = split_location(location_text)
+    else:
+        details["city"] = fields.get("city", "")
+        details["state"] = fields.get("state", "")
+        details["zip"] = fields.get("zip", "")
+        
+        # Check if we found any location data
+        if not any([details["city"], details["state"], details["zip"]]):
+            missing_fields.append("location")
+
+def parse_inmate_details_html(html: str, name_number: str) -> Optional[Dict]:
+    """
+    Extract inmate details from a detail page's HTML.
+    
+    Reads the same fields, with the same selectors, as the click path in
+    scrape_inmate_details.
+    
+    Args:
+        html: Detail page HTML
+        name_number: The unique name/booking number of the inmate
     
     Returns:
-        tuple: (playwright, browser, page) instances
+        dict: Dictionary containing detailed inmate information, or None if the
+        HTML has no detail view
+    """
+    tree = HTMLParser(html)
+    if not any(tree.css_first(selector) for selector in DETAIL_PANE_SELECTORS):
+        return None
+    
+    def text_of(node, selector: str) -> str:
+        child = node.css_first(selector)
+        return child.text().strip() if child else ""
+    
+    missing_fields = []
+    details = {}
+    
+    fields = {field: text_of(tree, selector) for field, selector in DETAIL_FIELD_SELECTORS.items()}
+    assign_detail_fields(details, fields, missing_fields)
+    
+    # Charges from the first selector that matches anything
+    charges = []
+    for selector in CHARGE_CONTAINER_SELECTORS:
+        charge_elements = tree.css(selector)
+        if charge_elements:
+            field_selectors = CHARGE_ROW_SELECTORS if selector.endswith("tr") else CHARGE_DIV_SELECTORS
+            for charge_elem in charge_elements[:MAX_CHARGES]:
+                charges.append({
+                    field: text_of(charge_elem, field_selector)
+                    for field, field_selector in zip(CHARGE_FIELDS, field_selectors)
+                })
+            break
+    
+    if not charges:
+        missing_fields.append("charges")
+        logger.warning(f"No charge elements found for inmate {name_number}")
+    
+    details["charges"] = charges
+    details["number_of_charges"] = len(charges)
+    details["scrape_timestamp_utc"] = datetime.utcnow().isoformat()
+    details["missing_fields"] = missing_fields
+    
+    if missing_fields:
+        logger.warning(f"Some fields could not be extracted for inmate {name_number}: {', '.join(missing_fields)}")
+    
+    return details
+
+async def fetch_inmate_details(page: Page, name_number: str) -> Optional[Dict]:
     """
-    # Read headless mode from config with default true
+    Fetch an inmate's detail page from config.DETAIL_URL_TEMPLATE over HTTP.
+    
+    The request goes through the page's browser context, so it shares the
+    session's cookies.
+    
+    Args:
+        page: Playwright page object
+        name_number: The unique name/booking number of the inmate
+    
+    Returns:
+        dict: Dictionary containing detailed inmate information, or None if the
+        page couldn't be fetched or parsed and the click path should be used
+    """
+    if HTMLParser is None:
+        return None
+    
+    url = config.DETAIL_URL_TEMPLATE.format(name_number=name_number)
+    
+    try:
+        response = await page.context.request.get(url, timeout=config.BROWSER_TIMEOUT, fail_on_status_code=False)
+        content_type = response.headers.get("content-type", "")
+        if not response.ok or "html" not in content_type:
+            logger.warning(f"Detail URL {url} returned {response.status} ({content_type}), falling back to clicking the row")
+            return None
+        
+        details = parse_inmate_details_html(await response.text(), name_number)
+        if details is None:
+            logger.warning(f"No detail view found at {url}, falling back to clicking the row")
+            return None
+        
+        logger.info(f"Fetched details for inmate {name_number} from {url} with {len(details['charges'])} charges")
+        return details
+        
+    except Exception as e:
+        logger.warning(f"Error fetching detail URL {url}, falling back to clicking the row: {str(e)}")
+        return None
+
+def browser_headless() -> bool:
+    """Read headless mode from config, defaulting to true."""
     headless = True
     if hasattr(config, "BROWSER_HEADLESS"):
         # Convert string to boolean if it's a string
@@ -525,19 +857,109 @@ async def initialize_browser():
             headless = config.BROWSER_HEADLESS.lower() == "true"
         else:
             headless = bool(config.BROWSER_HEADLESS)
+    return headless
+
+async def block_heavy_resources(route):
+    """Abort requests for images, fonts, media and analytics, and let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def new_roster_context(browser):
+    """
+    Open a browser context and page that skip images, fonts, media and analytics.
     
-    logger.info(f"Initializing browser in {'headless' if headless else 'headed'} mode")
+    JavaScript can be turned off with BROWSER_JAVASCRIPT for roster sites
+    that render server-side.
     
-    playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(headless=headless)
-    context = await browser.new_context()
+    Args:
+        browser: Browser instance
+    
+    Returns:
+        tuple: (context, page) instances
+    """
+    context = await browser.new_context(java_script_enabled=browser_javascript_enabled())
+    await context.route("**/*", block_heavy_resources)
     page = await context.new_page()
     
     # Set default timeout from config
     page.set_default_timeout(config.BROWSER_TIMEOUT)
     
+    return context, page
+
+async def load_roster(page: Page):
+    """
+    Navigate a page to the roster and wait until the roster table is present.
+    
+    Args:
+        page: Playwright page object
+    """
+    await page.goto(config.ROSTER_URL, timeout=config.BROWSER_TIMEOUT, wait_until="domcontentloaded")
+    await page.wait_for_selector(ROSTER_TABLE_SELECTORS, timeout=config.BROWSER_TIMEOUT)
+
+def browser_javascript_enabled() -> bool:
+    """Read whether pages run JavaScript from config, defaulting to true."""
+    enabled = getattr(config, "BROWSER_JAVASCRIPT", True)
+    # Convert string to boolean if it's a string
+    if isinstance(enabled, str):
+        return enabled.lower() == "true"
+    return bool(enabled)
+
+async def initialize_browser():
+    """
+    Initialize and return Playwright browser and page objects.
+    
+    Returns:
+        tuple: (playwright, browser, page) instances
+    """
+    headless = browser_headless()
+    logger.info(f"Initializing browser in {'headless' if headless else 'headed'} mode")
+    
+    playwright = await async_playwright().start()
+    browser = await playwright.chromium.launch(headless=headless)
+    context, page = await new_roster_context(browser)
+    
     return playwright, browser, page
 
+async def open_roster_pages(open_context, count: int, close_context=None) -> List[Tuple]:
+    """
+    Open additional pages on the roster, each in its own browser context.
+    
+    Args:
+        open_context: Coroutine function returning a new (context, page) pair
+        count: Number of pages to open
+        close_context: Coroutine function used to dispose of a context whose
+            page failed to load (defaults to closing the context)
+    
+    Returns:
+        list: (context, page) pairs that loaded the roster successfully
+    """
+    opened = []
+    
+    for _ in range(count):
+        try:
+            context, page = await open_context()
+        except Exception as e:
+            logger.warning(f"Could not open additional roster page: {str(e)}")
+            continue
+        
+        try:
+            await load_roster(page)
+            opened.append((context, page))
+        except Exception as e:
+            logger.warning(f"Could not open additional roster page: {str(e)}")
+            try:
+                if close_context is not None:
+                    await close_context(context)
+                else:
+                    await context.close()
+            except Exception as e:
+                logger.warning(f"Error closing browser context: {str(e)}")
+    
+    return opened
+
 async def close_browser(playwright, browser):
     """
     Properly close Playwright browser and playwright instance.
@@ -552,6 +974,112 @@ async def close_browser(playwright, browser):
     except Exception as e:
         logger.error(f"Error closing browser: {str(e)}")
 
+class BrowserPool:
+    """
+    One launched browser shared by every job in the process.
+    
+    Each job gets a fresh context and page from acquire() and gives the
+    context back with release(), so the browser is only started once.
+    At most `size` contexts are open at a time.
+    """
+    
+    _instance = None
+    
+    def __init__(self, playwright, browser, size: int):
+        self.playwright = playwright
+        self.browser = browser
+        self.semaphore = asyncio.Semaphore(size)
+    
+    @classmethod
+    async def get(cls, size: Optional[int] = None) -> "BrowserPool":
+        """
+        Get the process-wide pool, launching the browser on first use.
+        
+        Args:
+            size: Maximum number of open contexts (defaults to config.DETAIL_CONCURRENCY)
+        
+        Returns:
+            BrowserPool: The shared pool
+        """
+        if cls._instance is None:
+            if size is None:
+                size = getattr(config, "DETAIL_CONCURRENCY", 4)
+            
+            headless = browser_headless()
+            logger.info(f"Launching pooled browser in {'headless' if headless else 'headed'} mode")
+            
+            playwright = await async_playwright().start()
+            browser = await playwright.chromium.launch(headless=headless)
+            cls._instance = cls(playwright, browser, max(size, 1))
+        
+        return cls._instance
+    
+    async def acquire(self):
+        """
+        Open a new context and page, waiting if the pool is at capacity.
+        
+        Returns:
+            tuple: (context, page) instances
+        """
+        await self.semaphore.acquire()
+        try:
+            return await new_roster_context(self.browser)
+        except Exception:
+            self.semaphore.release()
+            raise
+    
+    async def release(self, context):
+        """
+        Close a context returned by acquire(), leaving the browser running.
+        
+        Args:
+            context: Browser context to close
+        """
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context: {str(e)}")
+        finally:
+            self.semaphore.release()
+    
+    @classmethod
+    async def shutdown(cls):
+        """Close the pooled browser and stop Playwright."""
+        if cls._instance is not None:
+            await close_browser(cls._instance.playwright, cls._instance.browser)
+            cls._instance = None
+
+async def scrape_new_inmate(inmate: Dict, page_pool: asyncio.Queue) -> Optional[Dict]:
+    """
+    Scrape details for a new inmate using a roster page borrowed from the pool.
+    
+    Args:
+        inmate: Roster row for the inmate
+        page_pool: Queue of pages showing the roster
+    
+    Returns:
+        dict: Combined roster and detail record, or None if details could not be retrieved
+    """
+    name_number = inmate["name_number"]
+    logger.info(f"Processing NEW inmate: {name_number}")
+    
+    page = await page_pool.get()
+    try:
+        # Get detailed information for the new inmate
+        details = await scrape_inmate_details(page, name_number)
+    finally:
+        page_pool.put_nowait(page)
+    
+    if not details:
+        logger.warning(f"Failed to get details for NEW inmate: {name_number}")
+        return None
+    
+    # Combine main roster data and detail data
+    full_record = {**inmate, **details}
+    full_record['timestamp_processed_utc'] = datetime.utcnow().isoformat()
+    logger.info(f"Successfully processed details for NEW inmate: {name_number}")
+    return full_record
+
 async def main():
     """Main entry point for the scraper module when run independently."""
     try:
@@ -560,71 +1088,85 @@ async def main():
         # Setup database
         setup_database()
         
-        # Load previously processed inmate IDs
-        processed_ids = load_processed_ids()
-        logger.info(f"Found {len(processed_ids)} previously processed inmates in database")
-        
         # Initialize list for new inmate data
         new_inmate_data = []
         
-        # Use context managers for better resource handling
-        async with async_playwright() as playwright:
-            browser = await playwright.chromium.launch(headless=True)
+        # Contexts are taken from the shared browser only once one is needed
+        pool = None
+        context = None
+        extra_contexts = []
+        
+        try:
+            # Read the roster without a browser when the site renders it server-side
+            inmates = await try_static_roster()
             
-            try:
-                # Create a new browser context and page
-                context = await browser.new_context()
-                page = await context.new_page()
-                
-                # Set default timeout
-                page.set_default_timeout(config.BROWSER_TIMEOUT)
+            if not inmates:
+                # Take a context from the shared browser rather than launching one
+                pool = await BrowserPool.get()
+                context, page = await pool.acquire()
                 
                 # Scrape the main roster
                 inmates = await scrape_main_roster(page)
-                logger.info(f"Found {len(inmates)} inmates on main roster")
-                
-                # Process inmates
-                for inmate in inmates:
-                    name_number = inmate["name_number"]
-                    
-                    # Check if this is a new inmate
-                    if name_number not in processed_ids:
-                        logger.info(f"Processing NEW inmate: {name_number}")
-                        
-                        # Get detailed information for the new inmate
-                        details = await scrape_inmate_details(page, name_number)
-                        
-                        if details:
-                            # Combine main roster data and detail data
-                            full_record = {**inmate, **details}
-                            full_record['timestamp_processed_utc'] = datetime.utcnow().isoformat()
-                            new_inmate_data.append(full_record)
-                            logger.info(f"Successfully processed details for NEW inmate: {name_number}")
-                        else:
-                            logger.warning(f"Failed to get details for NEW inmate: {name_number}")
-                
-                logger.info(f"Processed {len(new_inmate_data)} new inmates")
-                
-                # Mark all inmates as processed in the database
-                conn = sqlite3.connect(config.STATE_DB)
-                for inmate in inmates:
-                    mark_as_processed(conn, inmate['name_number'])
+            logger.info(f"Found {len(inmates)} inmates on main roster")
+            
+            # Look up which roster inmates haven't been processed before
+            unprocessed_ids = find_unprocessed_ids(inmate["name_number"] for inmate in inmates)
+            
+            new_inmates = [inmate for inmate in inmates if inmate["name_number"] in unprocessed_ids]
+            
+            if new_inmates:
+                # Detail views open by clicking a roster row, so every worker needs
+                # its own context with the roster loaded
+                if context is None:
+                    pool = await BrowserPool.get()
+                    context, page = await pool.acquire()
+                    await load_roster(page)
                 
-                # Commit changes and close connection
-                conn.commit()
-                conn.close()
+                page_pool = asyncio.Queue()
+                page_pool.put_nowait(page)
                 
-                # Print summary
-                if new_inmate_data:
-                    logger.info(f"First new inmate data: {new_inmate_data[0]}")
+                extra_count = min(getattr(config, "DETAIL_CONCURRENCY", 4), len(new_inmates)) - 1
+                for extra_context, extra_page in await open_roster_pages(pool.acquire, max(extra_count, 0), pool.release):
+                    extra_contexts.append(extra_context)
+                    page_pool.put_nowait(extra_page)
                 
-            finally:
-                # Close the browser properly
-                await browser.close()
+                logger.info(f"Scraping details for {len(new_inmates)} new inmates using {page_pool.qsize()} pages")
+                results = await asyncio.gather(
+                    *(scrape_new_inmate(inmate, page_pool) for inmate in new_inmates),
+                    return_exceptions=True
+                )
                 
+                for inmate, result in zip(new_inmates, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error processing NEW inmate {inmate['name_number']}: {str(result)}")
+                    elif result:
+                        new_inmate_data.append(result)
+            
+            logger.info(f"Processed {len(new_inmate_data)} new inmates")
+            
+            # Mark all inmates as processed in the database
+            mark_all_as_processed(get_db(), (inmate['name_number'] for inmate in inmates))
+            
+            # Print summary
+            if new_inmate_data:
+                logger.info(f"First new inmate data: {new_inmate_data[0]}")
+            
+        finally:
+            for extra_context in extra_contexts:
+                await pool.release(extra_context)
+            if context is not None:
+                await pool.release(context)
+            
     except Exception as e:
         logger.error(f"Error in main: {str(e)}", exc_info=True)
 
+async def run_standalone():
+    """Run the scraper once and shut the pooled browser down afterwards."""
+    try:
+        await main()
+    finally:
+        await BrowserPool.shutdown()
+
 if __name__ == "__main__":
     # Configure basic logging when run as a standalone script
     logging.basicConfig(
@@ -633,4 +1175,7 @@ if __name__ == "__main__":
     )
     
     # Run the main function
-    asyncio.run(main())
\ No newline at end of file
+    if uvloop is not None:
+        uvloop.run(run_standalone())
+    else:
+        asyncio.run(run_standalone())
\ No newline at end of file
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The scraper modules import each other by bare name, as when run from scraper/
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+import database
+
+
+@pytest.fixture
+def state_db(tmp_path, monkeypatch):
+    """Point the database module at a fresh state database for one test."""
+    database.close_connection()
+    monkeypatch.setattr(config, "STATE_DB", tmp_path / "state.db")
+    monkeypatch.setattr(database, "_processed_ids", None)
+
+    assert database.initialize_database()
+    yield database.get_connection()
+
+    database.close_connection()
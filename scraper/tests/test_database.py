@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+
+RUN_TIME = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def rows(conn):
+    """Return the processed_inmates table as {name_number: (last_seen, date_released)}."""
+    return {
+        name_number: (last_seen, date_released)
+        for name_number, last_seen, date_released in conn.execute(
+            "SELECT name_number, last_seen_timestamp, date_released FROM processed_inmates"
+        )
+    }
+
+
+def test_transaction_commits_on_exit(state_db):
+    with database.transaction() as conn:
+        conn.execute(
+            "INSERT INTO processed_inmates VALUES ('A', ?, ?, NULL)",
+            (RUN_TIME.isoformat(), RUN_TIME.isoformat()),
+        )
+        assert conn.in_transaction
+
+    assert not state_db.in_transaction
+    assert set(rows(state_db)) == {"A"}
+
+
+def test_nested_transaction_joins_outer_and_rolls_back_with_it(state_db):
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            assert database.mark_inmates_processed_bulk(["A", "B"], RUN_TIME)
+
+            # The inner block must not commit the outer transaction
+            with database.transaction() as conn:
+                assert conn.in_transaction
+            assert state_db.in_transaction
+
+            raise RuntimeError("fail after the inner block")
+
+    assert rows(state_db) == {}
+
+
+def test_record_run_state_marks_new_refreshes_and_releases(state_db):
+    database.load_processed_ids()
+    assert database.record_run_state(["A", "B", "C"], {"A", "B", "C"}, RUN_TIME) == []
+
+    later = RUN_TIME + timedelta(hours=1)
+    released = database.record_run_state(["D"], {"A", "C", "D"}, later)
+
+    assert released == ["B"]
+    assert rows(state_db) == {
+        "A": (later.isoformat(), None),
+        "B": (RUN_TIME.isoformat(), later.isoformat()),
+        "C": (later.isoformat(), None),
+        "D": (later.isoformat(), None),
+    }
+    assert database.is_inmate_processed("D")
+
+
+def test_record_run_state_rolls_back_every_step_on_failure(state_db, monkeypatch):
+    database.load_processed_ids()
+    database.record_run_state(["A", "B"], {"A", "B"}, RUN_TIME)
+    before = rows(state_db)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("release step failed")
+
+    monkeypatch.setattr(database, "find_released_inmates", fail)
+    later = RUN_TIME + timedelta(hours=1)
+
+    with pytest.raises(RuntimeError):
+        database.record_run_state(["C"], {"A", "C"}, later)
+
+    # Neither the new inmate nor the last-seen refresh were kept
+    assert rows(state_db) == before
+    assert not state_db.in_transaction
+    assert not database.is_inmate_processed("C")
+
+
+def test_helpers_raise_inside_an_enclosing_transaction(state_db, monkeypatch):
+    database.mark_inmates_processed_bulk(["A"], RUN_TIME)
+
+    def fail(conn, name_numbers):
+        raise RuntimeError("roster load failed")
+
+    monkeypatch.setattr(database, "load_roster_table", fail)
+
+    for helper in (database.update_last_seen, database.find_released_inmates):
+        with pytest.raises(RuntimeError):
+            with database.transaction():
+                database.mark_inmates_processed_bulk(["B"], RUN_TIME)
+                helper({"A", "B"}, RUN_TIME + timedelta(hours=1))
+
+        assert set(rows(state_db)) == {"A"}
+
+
+def test_update_last_seen_skips_recently_seen_rows(state_db):
+    database.mark_inmates_processed_bulk(["A", "B"], RUN_TIME)
+    state_db.execute(
+        "UPDATE processed_inmates SET last_seen_timestamp = ? WHERE name_number = 'B'",
+        ((RUN_TIME + timedelta(minutes=50)).isoformat(),),
+    )
+    state_db.commit()
+
+    # A was last seen an hour ago, B only 10 minutes ago
+    now = RUN_TIME + timedelta(hours=1)
+    assert database.update_last_seen({"A", "B"}, now) == 1
+
+    assert rows(state_db)["A"][0] == now.isoformat()
+    assert rows(state_db)["B"][0] == (RUN_TIME + timedelta(minutes=50)).isoformat()
+
+
+def test_update_last_seen_refreshes_rows_older_than_interval(state_db):
+    database.mark_inmates_processed_bulk(["A"], RUN_TIME)
+
+    just_inside = RUN_TIME + database.LAST_SEEN_REFRESH_INTERVAL
+    assert database.update_last_seen({"A"}, just_inside) == 0
+
+    past = just_inside + timedelta(seconds=1)
+    assert database.update_last_seen({"A"}, past) == 1
+
+
+def test_find_released_inmates_only_returns_missing_unreleased_ids(state_db):
+    database.mark_inmates_processed_bulk(["A", "B", "C"], RUN_TIME)
+    first = RUN_TIME + timedelta(hours=1)
+
+    # X is on the roster but was never processed, so it plays no part
+    assert sorted(database.find_released_inmates({"A", "X"}, first)) == ["B", "C"]
+
+    # Already released inmates are not released again
+    second = first + timedelta(hours=1)
+    assert database.find_released_inmates({"A"}, second) == []
+    assert rows(state_db)["B"][1] == first.isoformat()
+    assert rows(state_db)["A"][1] is None
+
+
+def test_find_released_inmates_with_empty_roster_releases_everyone(state_db):
+    database.mark_inmates_processed_bulk(["A", "B"], RUN_TIME)
+
+    assert sorted(database.find_released_inmates(set(), RUN_TIME)) == ["A", "B"]
+
+
+def test_standalone_helpers_return_defaults_on_error(state_db, monkeypatch):
+    def fail(conn, name_numbers):
+        raise RuntimeError("roster load failed")
+
+    monkeypatch.setattr(database, "load_roster_table", fail)
+
+    assert database.update_last_seen({"A"}, RUN_TIME) == 0
+    assert database.find_released_inmates({"A"}, RUN_TIME) == []
+    assert not state_db.in_transaction
@@ -0,0 +1,85 @@
+import csv
+
+import pytest
+
+import processor
+from processor import CsvAppender
+
+
+@pytest.fixture
+def appender(tmp_path):
+    appender = CsvAppender(tmp_path / "out.csv")
+    yield appender
+    appender.close()
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        return next(reader), list(reader)
+
+
+def test_new_file_header_keeps_first_seen_key_order(appender):
+    appender.append([{"b": 1, "a": 2}, {"c": 3, "a": 4}])
+    appender.close()
+
+    header, rows = read_rows(appender.path)
+    assert header == ["b", "a", "c"]
+    assert rows == [["1", "2", ""], ["", "4", "3"]]
+
+
+def test_existing_header_is_reused(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("a,b\n1,2\n", encoding="utf-8")
+
+    appender = CsvAppender(path)
+    appender.append([{"b": 4, "a": 3}])
+    appender.close()
+
+    assert read_rows(path) == (["a", "b"], [["1", "2"], ["3", "4"]])
+
+
+def test_header_is_written_once_across_batches(appender):
+    appender.append([{"a": 1}])
+    appender.append([{"a": 2}])
+    appender.close()
+
+    assert read_rows(appender.path) == (["a"], [["1"], ["2"]])
+
+
+def test_later_columns_widen_the_header(appender):
+    appender.append([{"name_number": "A", "charge1_desc": "x"}])
+    appender.append([{"name_number": "B", "charge1_desc": "y", "charge2_desc": "z"}])
+    appender.close()
+
+    header, rows = read_rows(appender.path)
+    assert header == ["name_number", "charge1_desc", "charge2_desc"]
+    assert rows == [["A", "x", ""], ["B", "y", "z"]]
+    assert not appender.path.with_name(appender.path.name + ".tmp").exists()
+
+
+def test_new_columns_in_existing_file_are_kept(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("a\n1\n", encoding="utf-8")
+
+    appender = CsvAppender(path)
+    appender.append([{"a": 2, "b": 3}])
+    appender.append([{"a": 4}])
+    appender.close()
+
+    assert read_rows(path) == (["a", "b"], [["1", ""], ["2", "3"], ["4", ""]])
+
+
+def test_write_to_csv_keeps_extra_charge_slots(tmp_path, monkeypatch):
+    monkeypatch.setattr(processor, "csv_appenders", {})
+    path = tmp_path / "inmates.csv"
+
+    one_charge = {"name_number": "A", "charges": [{"desc": "c1"}]}
+    two_charges = {"name_number": "B", "charges": [{"desc": "c1"}, {"desc": "c2"}]}
+    assert processor.write_to_csv([one_charge], path)
+    assert processor.write_to_csv([two_charges], path)
+    processor.close_csv_appenders()
+
+    header, rows = read_rows(path)
+    assert "charge2_desc" in header
+    assert [row[header.index("charge2_desc")] for row in rows] == ["", "c2"]
@@ -7,8 +7,11 @@ It generates demo data and then launches the main dashboard application.
 
 import os
 import sys
-import shutil
+import sqlite3
+import threading
+from datetime import datetime
 from pathlib import Path
+import pandas as pd
 import streamlit as st
 
 # Set page configuration first - must be the first Streamlit command
@@ -19,56 +22,247 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Add the current directory to the Python path
-sys.path.append(os.path.dirname(__file__))
+# Add the current directory to the Python path (once, as Streamlit reruns this script)
+repo_root = os.path.dirname(__file__)
+if repo_root not in sys.path:
+    sys.path.append(repo_root)
 
 # Import the demo data generator
 try:
     from api.generate_demo_data import generate_inmate_data, create_database, create_csv
+    from api.generate_demo_data import demo_data_dir as generated_data_dir
     demo_data_imported = True
 except ImportError:
     demo_data_imported = False
 
-# Create the necessary directory structure
-demo_data_dir = Path("dashboard/demo_data")
-demo_data_dir.mkdir(exist_ok=True, parents=True)
+@st.cache_resource(show_spinner=False)
+def build_demo_data():
+    """
+    Generate the demo database and CSV once per server process.
+    
+    Streamlit reruns this script on every widget interaction, so the
+    files are only written on the first run and reused afterwards. Files
+    left by an earlier process are reused as long as the database has rows.
+    
+    Returns:
+        tuple: (db_path, csv_path, inmate_count)
+    """
+    db_path = generated_data_dir / "demo_inmates.db"
+    csv_path = generated_data_dir / "demo_inmates.csv"
+    
+    # Reuse existing demo files rather than rewriting them
+    if db_path.exists() and csv_path.exists():
+        try:
+            conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                inmate_count = conn.execute("SELECT COUNT(*) FROM processed_inmates").fetchone()[0]
+            finally:
+                conn.close()
+            if inmate_count:
+                return db_path, csv_path, inmate_count
+        except sqlite3.Error:
+            pass  # Unreadable or incomplete, so generate it again
+    
+    inmates = generate_inmate_data()
+    db_path = create_database(inmates)
+    csv_path = create_csv(inmates)
+    return db_path, csv_path, len(inmates)
 
 # Generate demo data if the module was imported successfully
 if demo_data_imported:
     st.sidebar.info("🔄 Demo data has been generated for this deployment")
     
     try:
-        # Generate demo data
-        inmates = generate_inmate_data()
-        db_path = create_database(inmates)
-        csv_path = create_csv(inmates)
+        # Generate demo data (cached across reruns)
+        db_path, csv_path, inmate_count = build_demo_data()
         
         # Set environment variables to point to the demo data
         os.environ["STATE_DB"] = str(db_path)
         os.environ["OUTPUT_CSV"] = str(csv_path)
         os.environ["ROSTER_URL"] = "https://example.com/demo-jail-roster"
         
-        st.success(f"Successfully created demo data with {len(inmates)} inmate records")
+        st.success(f"Successfully created demo data with {inmate_count} inmate records")
     except Exception as e:
         st.error(f"Error generating demo data: {e}")
         st.exception(e)
 else:
     st.sidebar.warning("⚠️ Could not generate demo data. Using default paths.")
 
+@st.cache_resource(show_spinner=False)
+def open_connections():
+    """
+    Hold the connections opened by get_connection for the life of the server process.
+    
+    Returns:
+        tuple: (dict mapping database path to (mtime, connection), lock guarding it)
+    """
+    return {}, threading.Lock()
+
+def get_connection(db_path, mtime):
+    """
+    Get the long-lived read-only connection to the database, shared by every rerun.
+    
+    One connection is kept per database path; when the file is regenerated
+    the old connection is closed and a new one opened.
+    
+    Args:
+        db_path: Path to the SQLite database
+        mtime: Database modification time, so a regenerated file gets a new connection
+    
+    Returns:
+        sqlite3.Connection: Shared connection (Streamlit reruns may use other threads)
+    """
+    connections, lock = open_connections()
+    db_file = Path(db_path).resolve()
+    
+    with lock:
+        cached = connections.get(db_file)
+        if cached is not None:
+            cached_mtime, conn = cached
+            if cached_mtime == mtime:
+                return conn
+            
+            # The file has been replaced, so the old connection would only leak
+            conn.close()
+        
+        conn = sqlite3.connect(f"{db_file.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute("PRAGMA cache_size=-32000")  # 32 MB
+        conn.execute("PRAGMA temp_store=MEMORY")
+        connections[db_file] = (mtime, conn)
+        return conn
+
+# SQL condition for each custody status filter option
+CUSTODY_FILTERS = {
+    "All": "",
+    "In Custody": "WHERE in_custody = 1",
+    "Released": "WHERE in_custody = 0",
+}
+
+# Columns shown in the inmate table; name parts and bookkeeping timestamps are left out
+TABLE_COLUMNS = [
+    "booking_number", "full_name", "gender", "race", "booking_date", "release_date",
+    "in_custody", "charges", "bond_amount", "jurisdiction", "state"
+]
+
+@st.cache_data(show_spinner=False)
+def load_counts(db_path, mtime):
+    """
+    Count all records and those currently in custody, cached until the database file changes.
+    
+    Args:
+        db_path: Path to the SQLite database
+        mtime: Database modification time, used as part of the cache key
+    
+    Returns:
+        tuple: (total_count, in_custody)
+    """
+    return get_connection(db_path, mtime).execute(
+        "SELECT COUNT(*), COALESCE(SUM(in_custody = 1), 0) FROM processed_inmates"
+    ).fetchone()
+
+@st.cache_data(show_spinner=False)
+def load_inmates(db_path, mtime, custody_status="All"):
+    """
+    Load the inmate records matching a custody status, cached until the database file changes.
+    
+    Args:
+        db_path: Path to the SQLite database
+        mtime: Database modification time, used as part of the cache key
+        custody_status: One of the CUSTODY_FILTERS options
+    
+    Returns:
+        DataFrame: Matching inmate records, most recent booking first
+    """
+    return pd.read_sql_query(
+        f"SELECT {', '.join(TABLE_COLUMNS)} FROM processed_inmates "
+        f"{CUSTODY_FILTERS[custody_status]} ORDER BY booking_date DESC",
+        get_connection(db_path, mtime),
+        dtype_backend="pyarrow"  # Arrow-backed columns avoid per-cell Python string objects
+    )
+
+@st.cache_data(show_spinner=False)
+def load_race_counts(db_path, mtime):
+    """
+    Count all inmate records by race, cached until the database file changes.
+    
+    Args:
+        db_path: Path to the SQLite database
+        mtime: Database modification time, used as part of the cache key
+    
+    Returns:
+        Series: Number of records for each race, most common first
+    """
+    return pd.read_sql_query(
+        "SELECT race, COUNT(*) AS n FROM processed_inmates "
+        "GROUP BY race HAVING race IS NOT NULL ORDER BY n DESC",
+        get_connection(db_path, mtime)
+    ).set_index("race")["n"]
+
+# Rows shown per page of the inmate table
+TABLE_PAGE_SIZE = 100
+
+# Reruns only the decorated function on widget changes (st.fragment needs Streamlit 1.37+)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None) or (lambda func: func)
+
+@fragment
+def render_inmate_table(db_path, mtime):
+    """
+    Render the custody filter and the matching inmate records.
+    
+    Changing the filter reruns only this function, not the whole page.
+    Fragments can't write to the sidebar, so the filter sits above the table.
+    
+    Args:
+        db_path: Path to the SQLite database
+        mtime: Database modification time, used as part of the cache key
+    """
+    # Allow filtering
+    st.subheader("Inmate Data")
+    
+    # Filter by custody status
+    custody_status = st.radio(
+        "Custody Status:",
+        list(CUSTODY_FILTERS),
+        index=0,
+        horizontal=True
+    )
+    
+    # Load only the matching rows (cached until the database changes)
+    df = load_inmates(db_path, mtime, custody_status)
+    
+    # Display one page of rows at a time so only that slice is sent to the browser
+    page_count = max(1, -(-len(df) // TABLE_PAGE_SIZE))
+    page = 1
+    if page_count > 1:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    start = (page - 1) * TABLE_PAGE_SIZE
+    st.dataframe(df.iloc[start:start + TABLE_PAGE_SIZE])
+    st.caption(f"Showing rows {min(start + 1, len(df))}-{min(start + TABLE_PAGE_SIZE, len(df))} of {len(df)}")
+
+def render_statistics(db_path, mtime):
+    """
+    Render statistics over every record, from small cached aggregates.
+    
+    This sits outside the table fragment, so filtering and paging the
+    table don't re-render the chart.
+    
+    Args:
+        db_path: Path to the SQLite database
+        mtime: Database modification time, used as part of the cache key
+    """
+    # Basic statistics
+    st.subheader("Statistics")
+    
+    # Demographics by race (counted in SQL and cached)
+    race_counts = load_race_counts(db_path, mtime)
+    st.bar_chart(race_counts)
+
 # Display the dashboard content
 st.title("📊 Jail Roster Data Monitor")
 st.markdown("Dashboard for monitoring jail roster data collected by the scraper.")
 
 # Load and display data directly here instead of importing dashboard/app.py
 try:
-    # Add the scraper directory to path to import config
-    sys.path.append(str(Path(__file__).parent))
-    
-    # Import necessary modules
-    import sqlite3
-    import pandas as pd
-    from datetime import datetime, timedelta
-    
     # Define paths
     db_path = os.environ.get("STATE_DB", "dashboard/demo_data/demo_inmates.db")
     csv_path = os.environ.get("OUTPUT_CSV", "dashboard/demo_data/demo_inmates.csv")
@@ -76,23 +270,20 @@ try:
     # Status information
     col1, col2, col3 = st.columns(3)
     
-    if os.path.exists(db_path):
-        last_modified = datetime.fromtimestamp(os.path.getmtime(db_path))
+    # One stat call both checks the database exists and gets its modification time
+    try:
+        db_mtime = os.stat(db_path).st_mtime
+    except FileNotFoundError:
+        db_mtime = None
+    
+    if db_mtime is not None:
+        last_modified = datetime.fromtimestamp(db_mtime)
         
         with col1:
             st.info(f"💾 Last Data Update: {last_modified.strftime('%Y-%m-%d %H:%M:%S')}")
         
-        # Connect to database and get counts
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Get total count
-        cursor.execute("SELECT COUNT(*) FROM processed_inmates")
-        total_count = cursor.fetchone()[0]
-        
-        # Get in custody count
-        cursor.execute("SELECT COUNT(*) FROM processed_inmates WHERE in_custody=1")
-        in_custody = cursor.fetchone()[0]
+        # Get total and in custody counts in a single pass
+        total_count, in_custody = load_counts(db_path, db_mtime)
         
         with col2:
             st.info(f"🔢 Total Records: {total_count}")
@@ -100,41 +291,10 @@ try:
         with col3:
             st.info(f"🔒 Currently In Custody: {in_custody}")
         
-        # Allow filtering
-        st.subheader("Inmate Data")
-        
-        # Load data
-        df = pd.read_sql_query("SELECT * FROM processed_inmates ORDER BY booking_date DESC", conn)
-        
-        # Filters in sidebar
-        st.sidebar.header("Filters")
-        
-        # Filter by custody status
-        custody_status = st.sidebar.radio(
-            "Custody Status:",
-            ["All", "In Custody", "Released"],
-            index=0
-        )
-        
-        if custody_status == "In Custody":
-            df = df[df["in_custody"] == True]
-        elif custody_status == "Released":
-            df = df[df["in_custody"] == False]
-        
-        # Display data
-        st.dataframe(df)
-        
-        # Basic statistics
-        st.subheader("Statistics")
-        
-        # Check if we have race column for demographics
-        if "race" in df.columns:
-            # Demographics by race
-            race_counts = df["race"].value_counts()
-            st.bar_chart(race_counts)
+        # Filtering only reruns the table section
+        render_inmate_table(db_path, db_mtime)
         
-        # Close connection
-        conn.close()
+        render_statistics(db_path, db_mtime)
     else:
         st.error(f"Database file not found at {db_path}")
         